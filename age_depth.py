@@ -16,13 +16,17 @@ Functions:
 
 """
 import glob
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 
 from ocean_drilling_db import data_filepaths as dfp
+from ocean_drilling_db import schema
+from ocean_drilling_db.pipeline import run_loaders
 
-def load_dsdp_age_depth():
+def load_dsdp_age_depth(registry):
     # Read in data and rename columns
     dsdp_data = pd.read_csv(dfp.dsdp_age_depth, sep="\t", header=0,
                             skiprows=None, encoding='windows-1252')
@@ -33,13 +37,9 @@ def load_dsdp_age_depth():
                          'top_age', 'bottom_age', 'source')
 
     dsdp_data[['top_age', 'bottom_age']] = np.multiply(dsdp_data[['top_age', 'bottom_age']], 1000000)
-    dsdp_data = dsdp_data.applymap(str)
 
     # Assign site keys
-    site_keys = pd.read_csv('hole_metadata.csv', sep='\t', index_col=0)
-    site_keys = site_keys[['site_key','site']]
-
-    full_data = pd.merge(site_keys, dsdp_data, how = 'inner', on = 'site')
+    full_data = registry.assign_site_keys(dsdp_data)
     full_data = full_data.reindex(['site_key', 'leg', 'site', 'hole',
                                    'top_depth', 'bottom_depth', 'top_age',
                                    'bottom_age', 'type', 'source'], axis=1)
@@ -52,17 +52,15 @@ def load_dsdp_age_depth():
                                        'bottom_depth', 'bottom_age', 'type', 'source'], axis=1)
     bottom_values = bottom_values.rename(columns={'bottom_depth': 'depth', 'bottom_age': 'age'})
     final_data = pd.concat([top_values, bottom_values])
-    final_data[['age', 'depth']] = final_data.loc[:,['age', 'depth']].applymap(float)
 
     # Sort and clean
     final_data = final_data.sort_values(['site_key', 'depth'])
-    final_data = final_data.replace(to_replace='nan', value=np.nan)
 
-    return final_data
+    return schema.enforce(final_data, schema.age_depth)
 
 
 ### Difference between age-depth and age-profiles files??
-def load_odp_age_depth():
+def load_odp_age_depth(registry):
     odp_data = pd.read_csv(dfp.odp_age_depth, sep="\t", header=0,
                            skiprows=None, encoding='windows-1252')
 
@@ -70,18 +68,14 @@ def load_odp_age_depth():
     odp_data.columns = ('leg', 'site', 'hole', 'source', 'depth', 'age', 'type')
     odp_data = odp_data.reindex(['leg', 'site', 'hole', 'depth', 'age', 'type', 'source'], axis=1)
     odp_data['age'] = np.multiply(odp_data['age'], 1000000)
-    odp_data = odp_data.applymap(str)
 
     # Assign site keys
-    site_keys = pd.read_csv('hole_metadata.csv', sep='\t', index_col=0)
-    site_keys = site_keys[['site_key','site']]
-    full_data = pd.merge(site_keys, odp_data, how = 'inner', on = 'site')
+    full_data = registry.assign_site_keys(odp_data)
     full_data = full_data.reindex(['site_key', 'leg', 'site', 'hole', 'depth', 'age', 'type', 'source'], axis=1)
-    full_data[['age', 'depth']] = full_data.loc[:,['age', 'depth']].applymap(float)
 
-    return full_data
+    return schema.enforce(full_data, schema.age_depth)
 
-def load_odp_age_profiles():
+def load_odp_age_profiles(registry):
     data = pd.read_csv(dfp.odp_age_profile, sep="\t", header=0,
                            skiprows=None, encoding='windows-1252')
     # Filter out those with depth difference greater than 1 core length (10m) (11m to account for 10% error/expansion)
@@ -100,28 +94,69 @@ def load_odp_age_profiles():
                          'Ageprofile Datum Description': 'type'})
     data.hole = data.hole.str.strip()
     data.type = data.type.str.strip()
-    data.site = data['site'].astype(str)
 
     # Get site keys and add to DataFrame
-    site_keys = pd.read_csv('hole_metadata.csv', sep='\t', index_col=0)
-    site_keys = site_keys[['site_key','site']]
-
-    full_data = pd.merge(site_keys, data, how='inner', on='site')
+    full_data = registry.assign_site_keys(data)
     full_data = full_data[['site_key', 'leg', 'site', 'hole', 'depth', 'age', 'type']]
     full_data['age'] = full_data['age'] * 1000000
 
-    return full_data
+    return schema.enforce(full_data, schema.age_depth)
+
+def parse_age_control(file):
+    # Open workbook once and read only the 'Age Control' sheet, if present
+    with pd.ExcelFile(file) as workbook:
+        if 'Age Control' in workbook.sheet_names:
+            return workbook.parse('Age Control')
+    return None
 
-def load_iodp_age_depth():
+def age_control_cache_path(file):
+    return os.path.join(dfp.iodp_age_depth_cache, os.path.basename(file) + '.pkl')
 
-    files = glob.glob(os.path.join(dfp.iodp_age_depth,'*.xls*'))
+def age_control_cache_key(file):
+    # Workbooks are re-parsed only when their path, size or mtime changes
+    file_stat = os.stat(file)
+    return (os.path.abspath(file), file_stat.st_size, file_stat.st_mtime_ns)
 
-    fossil_data = pd.DataFrame()
+def load_age_control_sheets(files, executor=None):
+    sheets = {}
     for file in files:
-        sheets = pd.ExcelFile(file).sheet_names
-        if 'Age Control' in sheets:
-            sheet_data = pd.read_excel(file, 'Age Control')
-            fossil_data = fossil_data.append(sheet_data, sort=True)
+        cache_path = age_control_cache_path(file)
+        if os.path.exists(cache_path):
+            cache_key, sheet_data = pd.read_pickle(cache_path)
+            if cache_key == age_control_cache_key(file):
+                sheets[file] = sheet_data
+
+    # Parse new and changed workbooks (across the executor's workers if given) and cache them
+    stale_files = [file for file in files if file not in sheets]
+    if stale_files:
+        os.makedirs(dfp.iodp_age_depth_cache, exist_ok=True)
+        if executor is not None:
+            parsed = executor.map(parse_age_control, stale_files)
+        else:
+            parsed = map(parse_age_control, stale_files)
+        for file, sheet_data in zip(stale_files, parsed):
+            pd.to_pickle((age_control_cache_key(file), sheet_data),
+                         age_control_cache_path(file))
+            sheets[file] = sheet_data
+
+    # Return in original file order, skipping workbooks with no 'Age Control' sheet
+    return [sheets[file] for file in files if sheets[file] is not None]
+
+def iodp_age_control_files():
+    return glob.glob(os.path.join(dfp.iodp_age_depth,'*.xls*'))
+
+def load_iodp_age_depth(registry, n_workers=None):
+
+    files = iodp_age_control_files()
+
+    # Workbooks are parsed on a pool of their own only if n_workers is given and
+    # this is not already a worker of a pool (which would oversubscribe the cores)
+    if n_workers is not None and n_workers > 1 and multiprocessing.parent_process() is None:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            sheets = load_age_control_sheets(files, executor)
+    else:
+        sheets = load_age_control_sheets(files)
+    fossil_data = pd.concat(sheets, sort=True)
     fossil_data = fossil_data.reset_index()
 
     # Cut to relevant data
@@ -159,16 +194,14 @@ def load_iodp_age_depth():
     fossil_data_final['age_old'] = fossil_data_final['age_old'].str.strip(to_strip = 'Ma')
     fossil_data_final['age_young'] = fossil_data_final['age_young'].str.strip()
 
-    # Average ranges
+    # Average ranges, open-ended ranges ('-5', '5-') take the second entry
     for m in ['age','age_old','age_young']:
-        for n in range(len(fossil_data_final)):
-            if '-' in fossil_data_final.loc[n,m]:
-                age_range = fossil_data_final.loc[n,m].split('-')
-                if '' in age_range:
-                    fossil_data_final.loc[n,m] = age_range[1]
-                else:
-                    age_range = [float(i) for i in age_range]
-                    fossil_data_final.loc[n,m] = np.mean(age_range)
+        ranges = fossil_data_final.loc[fossil_data_final[m].str.contains('-', regex=False), m]
+        if len(ranges):
+            bounds = ranges.str.split('-', expand=True)
+            open_ended = (bounds == '').any(axis=1)
+            averages = bounds[~open_ended].astype(float).mean(axis=1)
+            fossil_data_final.loc[ranges.index, m] = bounds[1].where(open_ended, averages)
 
     # Average depths
     fossil_data_final['depth'] = pd.DataFrame([fossil_data_final['depth_bottom'], fossil_data_final['depth_top']]).mean()
@@ -176,11 +209,11 @@ def load_iodp_age_depth():
     fossil_data_final['leg'] = fossil_data_final['leg'].str.replace('\.0','')
 
     # Add leg, site, hole to all records
-    for n in range(len(fossil_data_final)):
-        if fossil_data_final.loc[n,'label'] != 'nan':
-            fossil_data_final.loc[n,'leg'] = fossil_data_final.loc[n,'label'].split('-')[0]
-            fossil_data_final.loc[n,'site'] = fossil_data_final.loc[n,'label'].split('-')[1][:5]
-            fossil_data_final.loc[n,'hole'] = fossil_data_final.loc[n,'label'].split('-')[1][5]
+    labelled = fossil_data_final['label'] != 'nan'
+    label_parts = fossil_data_final.loc[labelled, 'label'].str.split('-')
+    fossil_data_final.loc[labelled, 'leg'] = label_parts.str[0]
+    fossil_data_final.loc[labelled, 'site'] = label_parts.str[1].str[:5]
+    fossil_data_final.loc[labelled, 'hole'] = label_parts.str[1].str[5]
 
     # Filter out those with depth difference greater than 1 core length (10m) (11m to account for 10% error/expansion)
     fdf = fossil_data_final
@@ -188,42 +221,36 @@ def load_iodp_age_depth():
     fdf = fdf.iloc[diff[diff < 11].index.tolist(),:]
 
     # Assign site keys
-    site_keys = pd.read_csv('hole_metadata.csv', sep='\t', index_col=0)
-    site_keys = site_keys[['site_key','site']]
-    fdf = pd.merge(site_keys, fdf, how = 'inner', on = 'site')
+    fdf = registry.assign_site_keys(fdf)
     fdf = fdf.reindex(['site_key', 'leg', 'site', 'hole', 'depth', 'age', 'age_old', 'age_young'], axis=1)
 
     # Assign ages
     fdf[['age_old','age_young','age']] = fdf[['age_old','age_young','age']].astype(float)
     fdf = fdf.replace('nan', np.nan)
-    for n in fdf.index:
-        if np.isnan(fdf.loc[n,'age']):
-            if np.isnan(fdf.loc[n,'age_young']):
-                fdf.loc[n,'age'] = fdf.loc[n,'age_old']
-            elif np.isnan(fdf.loc[n,'age_old']):
-                fdf.loc[n,'age'] = fdf.loc[n,'age_young']
-            else:
-                fdf.loc[n,'age'] = (fdf.loc[n,'age_old'] + fdf.loc[n,'age_young'])/2
+    # Missing ages from the age range: its midpoint, or whichever bound is given
+    range_age = np.where(fdf['age_young'].isna(), fdf['age_old'],
+                         np.where(fdf['age_old'].isna(), fdf['age_young'],
+                                  (fdf['age_old'] + fdf['age_young'])/2))
+    fdf['age'] = fdf['age'].where(fdf['age'].notna(), range_age)
 
     fdf['age'] = fdf['age'] * 1000000
     fdf = fdf.reindex(['site_key', 'leg', 'site', 'hole', 'depth', 'age'], axis=1)
 
-    return fdf
+    return schema.enforce(fdf, schema.age_depth)
 
 
-def compile_age_depth():
-    dsdp = load_dsdp_age_depth()
-    odp = load_odp_age_depth()
-    odp_p = load_odp_age_profiles()
-    iodp = load_iodp_age_depth()
+def compile_age_depth(registry, executor=None, manifest=None, report=None):
+    # With a shared pool, new and changed IODP workbooks are parsed across its
+    # workers first, so the IODP loader (run on a single worker) reads them cached
+    if executor is not None:
+        load_age_control_sheets(iodp_age_control_files(), executor)
+    dsdp, odp, odp_p, iodp = run_loaders([(load_dsdp_age_depth, registry),
+                                          (load_odp_age_depth, registry),
+                                          (load_odp_age_profiles, registry),
+                                          (load_iodp_age_depth, registry)], executor, manifest, report)
 
     age_depth = pd.concat((dsdp, odp, odp_p, iodp), axis=0, sort=False).reset_index(drop=True)
-    for col in age_depth:
-        if age_depth[col].dtype == object:
-            age_depth[col] = age_depth[col].str.strip()
-    age_depth = age_depth.replace('', np.nan)
-    age_depth = age_depth.applymap(str)
-    age_depth = age_depth.reset_index(drop=True)
+    age_depth = schema.enforce(age_depth, schema.age_depth)
     return age_depth
 
 
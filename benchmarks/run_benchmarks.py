@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 10:58:03 2026
+
+Benchmarks of every loader and compile function on synthetic inputs (see
+synthetic_data.py) at multiples of the current number of holes and samples.
+
+For each scale a synthetic data/ tree is generated under
+benchmarks/data/scale_<n>x (and reused on later runs), and compile_metadata,
+each load_* function, and each compile_* function are run on it with the
+timing and memory records of ocean_drilling_db.instrument. Parsed IODP
+workbooks are not cached between runs. The records of each scale are written
+to benchmarks/results/benchmark_<n>x.json, and the best wall time of every
+function at every scale, with its growth over the smallest scale, is printed.
+
+Run from the repository root, optionally with the scales to run:
+    python benchmarks/run_benchmarks.py [1 10 100]
+
+"""
+import json
+import os
+import shutil
+import sys
+
+import pandas as pd
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(bench_dir))
+
+import metadata
+import age_depth
+import iw_chem
+import mad
+import cns
+import synthetic_data
+from ocean_drilling_db import data_filepaths as dfp
+from ocean_drilling_db.instrument import Report
+from ocean_drilling_db.registry import MetadataRegistry
+
+# Multiples of the current number of holes and samples to benchmark
+scales = [1, 10, 100]
+
+# Runs of every function at each scale, the fastest is reported
+repeats = 1
+
+# Option to regenerate synthetic inputs that already exist
+# Set regenerate variable to either True or False
+regenerate = False
+
+data_dir = os.path.join(bench_dir, 'data')
+results_dir = os.path.join(bench_dir, 'results')
+
+
+def benchmarks(registry):
+    # (function, arguments) of every loader, then every compile function
+    return [(age_depth.load_dsdp_age_depth, (registry,)),
+            (age_depth.load_odp_age_depth, (registry,)),
+            (age_depth.load_odp_age_profiles, (registry,)),
+            (age_depth.load_iodp_age_depth, (registry,)),
+            (iw_chem.load_dsdp_iw, ()),
+            (iw_chem.load_odp_iw, ()),
+            (iw_chem.load_iodp_iw, ()),
+            (iw_chem.load_chikyu_iw, (registry,)),
+            (mad.load_dsdp_mad, ()),
+            (mad.load_odp_mad, ()),
+            (mad.load_iodp_mad, ()),
+            (mad.load_chikyu_mad, (registry,)),
+            (cns.load_dsdp_cns, ()),
+            (cns.load_odp_cns, ()),
+            (cns.load_iodp_cns, ()),
+            (cns.load_chikyu_cns, (registry,)),
+            (age_depth.compile_age_depth, (registry,)),
+            (iw_chem.compile_iw, (registry,)),
+            (mad.compile_mad, (registry,)),
+            (cns.compile_cns, (registry,))]
+
+def synthetic_root(scale):
+    # Data tree of a scale, generated unless already complete
+    root = os.path.join(data_dir, 'scale_{}x'.format(scale))
+    summary = os.path.join(root, 'synthetic.json')
+    if regenerate == True or not os.path.exists(summary):
+        shutil.rmtree(root, ignore_errors=True)
+        print('Generating synthetic inputs at {}x...'.format(scale))
+        holes = synthetic_data.generate(root, scale)
+        with open(summary, 'w') as f:
+            json.dump({'scale': scale, 'holes': holes}, f)
+    return root
+
+def run_scale(scale):
+    root = synthetic_root(scale)
+    report = Report()
+    # Loaders read the data/ paths of data_filepaths relative to the working directory
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        for n in range(repeats):
+            hole_metadata = report.call(metadata.compile_metadata)
+        registry = MetadataRegistry(hole_metadata)
+        for func, args in benchmarks(registry):
+            for n in range(repeats):
+                shutil.rmtree(dfp.iodp_age_depth_cache, ignore_errors=True)
+                report.call(func, *args)
+    finally:
+        os.chdir(cwd)
+    report.save(os.path.join(results_dir, 'benchmark_{}x.json'.format(scale)))
+    return report
+
+def summarize(reports):
+    # Best wall time (s) of every function at every scale, and its growth
+    times = pd.DataFrame({'{}x'.format(scale): pd.DataFrame(report.records).groupby('name', sort=False)['wall_s'].min()
+                          for scale, report in reports.items()})
+    first = times.columns[0]
+    for col in times.columns[1:]:
+        times['{}/{}'.format(col, first)] = times[col] / times[first]
+    return times.round(2)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        scales = [int(arg) for arg in sys.argv[1:]]
+    reports = {}
+    for scale in sorted(scales):
+        reports[scale] = run_scale(scale)
+    print(summarize(reports).to_string())
+
+# eof
@@ -0,0 +1,858 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 09:41:26 2026
+
+Synthetic DSDP, ODP, IODP, and Chikyu input files for benchmarking, written in
+the formats (columns, separators, encodings, padding, and quirks) read by the
+load_* functions and compile_metadata, under <root>/data/ at the paths set in
+ocean_drilling_db/data_filepaths.py.
+
+At scale 1 the number of holes and samples of each source is about that of the
+current archive (base_holes, base_rows, base_files); larger scales multiply
+both. Hole IDs follow each program's conventions (DSDP blank first holes,
+IODP U/M sites, Chikyu C sites), and the values are random but physically
+plausible, including the multi-entry cells, detection-limit flags and
+placeholders the loaders clean up.
+
+Usage:
+    generate(root, scale=1, seed=0)
+
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from ocean_drilling_db import data_filepaths as dfp
+
+# Holes of each program at scale 1
+base_holes = {'dsdp': 1112, 'odp': 1900, 'iodp': 444, 'chikyu': 70}
+
+# Rows of each input file at scale 1. ODP pore water, MAD, and carbon counts are
+# estimates of the Janus downloads.
+base_rows = {
+    'dsdp_iw': 14718, 'dsdp_mad': 26268, 'dsdp_carbon': 34162, 'dsdp_age_depth': 5151,
+    'odp_iw': 25000, 'odp_mad': 90000, 'odp_carbon': 60000,
+    'odp_age_depth': 8111, 'odp_age_profile': 4573,
+    'iodp_iw': 7152, 'iodp_mad': 15547, 'iodp_carbon': 9179,
+    'chikyu_iw': 1475, 'chikyu_mad': 8599, 'chikyu_carbon': 5037,
+}
+
+# Files of the directory-based inputs at scale 1
+base_files = {'iodp_age_depth': 290, 'chikyu_iw': 53, 'chikyu_mad': 62, 'chikyu_carbon': 60}
+
+# Age control datums per IODP workbook
+datums_per_workbook = 15
+
+letters = np.array(list('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+
+dsdp_meta_columns = [
+    'leg', 'site', 'hole', 'well logging', 'latitude', 'longitude', 'ocean',
+    'ocean hemisphere', 'sea', 'physographic feature', 'hard rock feature', 'ta', 'td',
+    're-entry', 'site survey', 'site termination', 'crust', 'equipment test',
+    'heat flow', 'in situ pore water', 'hydraulic piston core', 'variable length hpc',
+    'pressure core barrel', 'punch core', 'extended core barrel', 'water depth(m)',
+    'total penetration(m)', 'drilled penetration(m)', 'cored penetration(m)',
+    'number of cores recovered', 'meters recovered', 'percent recovery',
+    'meters of hard rock cored', 'number of hard rock cores',
+    'meters of hard rock recovered', 'depth to basememnt(m)',
+    'oldest sediment sub-bottom depth', 'oldest sediment depth below sealevel',
+    'oldest sediment core number', 'oldest sediment age', 'oldest sediment lithology',
+    'oldest sediment lithology composition', 'oldest sediment source',
+    'oldest sediment heterogeneity', 'oldest sediment hardness', 'oldest comp1',
+    'oldest comp2', 'hard rock descriptions and comments']
+
+dsdp_iw_columns = [
+    'leg', 'site', 'hole', 'core', 'section', 'top of sampled interval (cm)',
+    'bottom of sampled interval(cm)', 'depth to core (m)', 'depth to sample (m)',
+    'card type', 'card number', 'pH electrode type', 'pH', 'alkalinity measurement type',
+    'alkalinity', 'salinity', 'data field #1', 'data field #2', 'data field #3',
+    'data field #4', 'data field #5', 'data field #6', 'reference']
+
+dsdp_mad_columns = [
+    'leg', 'site', 'hole', 'core', 'section', 'top interval depth (cm)',
+    'bottom interval depth (cm)', 'top of core depth (m)', 'sample depth (m)',
+    'wet water content (no units)', 'porosity', 'wet bulk density (g/cc)',
+    'grain density (g/cc)', 'salt correction leg 96 (* or blank)']
+
+dsdp_carbon_columns = [
+    'leg', 'site', 'hole', 'core', 'section', 'top interval depth (cm)',
+    'bottom interval depth (cm)', 'top of core depth (m)', 'sample depth (m)',
+    'percent total carbon', 'percent organic carbon',
+    'percent calcium carbonate (CaCO3)', 'method code', 'data source code']
+
+dsdp_age_depth_columns = [
+    'leg', 'site', 'hole', 'age mnemonic', 'auxiliary age mnemonic',
+    'top of section depth(m)', 'bottom of section depth(m)', 'special condition', 'age',
+    'auxiliary age', 'averaged age', 'age top of section(million years)',
+    'age bottom of section(million years)', 'average age(million years)', 'data source']
+
+odp_meta_columns = [
+    'Leg', 'Site', 'Hole', '    Latitude', '    Longtitude', '    Arrival Date',
+    '    Departure Date', '    Time on Hole(dd:hh:mm)', '    Water Depth',
+    '    Core Type(s)', '    Numbers of Cores', '    Total Penetration (m) ',
+    '    Coring Penetration (m) ', '    Drilled (m)', '    Core Recovered (m)',
+    '    Core Recovered %', '']
+
+# Sample identifiers of the Janus sample tables
+odp_sample_columns = ['Leg', 'Site', 'H', 'Cor', 'T', 'Sc', 'Top(cm)', 'Bot(cm)', 'Depth (mbsf)']
+
+# In the column order load_odp_iw assigns its standard names
+odp_iw_analyte_columns = [
+    'Al (uM)', 'NH4 (uM)', 'B (mM)', 'Br (uM)', 'Ca (mM)', 'Cl (mM)', 'F (uM)', 'I (uM)',
+    'Fe (uM)', 'Li (uM)', 'Mg (mM)', 'Mn (uM)', 'NO3 (uM)', 'pH', 'PO4 (uM)', 'K (mM)',
+    'Rb (uM)', 'Na (mM)', 'Sr (uM)', 'SO4 (mM)', 'Si (uM)', 'Alkalinity (mM)', 'Salinity',
+    'Ba (uM)', 'Pb (uM)', 'H2 (nM)', 'DIC (mM)', 'Formate (uM)', 'ppH', 'DOC (mM)',
+    'Acetate (uM)', 'NO2 (uM)', 'Color', 'Sulfide (uM)', 'Zn (mM)']
+
+odp_mad_columns = odp_sample_columns + [
+    'Method', 'WC wet (%)', 'WC dry (%)', 'BD (g/cc)', 'DD (g/cc)', 'GD (g/cc)', 'PO (%)',
+    'VR']
+
+odp_carbon_columns = odp_sample_columns + [
+    'INOR_C (wt %)', 'CaCO3 (wt %)', 'TOT_C (wt %)', 'ORG_C (wt %)', 'N (wt %)',
+    'S (wt %)', 'H (mg HC/g)']
+
+odp_age_depth_columns = [
+    'Leg', 'Site', 'H', 'Age Model Type           ', 'Depth (mbsf)', '    Age (Ma)',
+    'Control Point Comment']
+
+odp_age_profile_columns = [
+    'Leg', 'Site', 'Hole', 'Ageprofile Fossil Group', 'Ageprofile Depth Top',
+    'Ageprofile Depth Base', 'Ageprofile Age Young', 'Ageprofile Age Old',
+    'Ageprofile Datum ID', 'Ageprofile Datum Description'.ljust(80),
+    'Ageprofile Datum Type', 'Genus Subgenus'.ljust(80), 'Species Subspecies'.ljust(80),
+    'Depth Map Type', 'MCD Flag', 'Compression Flag']
+
+iodp_meta_columns = [
+    'Exp', 'Site', 'Hole', 'Latitude', 'Longitude', 'Water depth (m)',
+    'Penetration DSF (m)', 'Cored interval (m)', 'Recovered length (m)', 'Recovery (%)',
+    'Drilled interval (m)', 'Drilled interval (no.)', 'Total cores (no.)',
+    'APC cores (no.)', 'HLAPC cores (no.)', 'XCB cores (no.)', 'RCB cores (no.)',
+    'Other cores (no.)', 'Date started (UTC)', 'Date finished (UTC)',
+    'Time on hole (days)', 'Comments', '']
+
+# Sample identifiers of the LIMS reports
+iodp_sample_columns = ['Exp', 'Site', 'Hole', 'Core', 'Type', 'Sect', 'A/W']
+
+# Positional: load_iodp_iw maps these to standard analytes by column order
+iodp_iw_columns = iodp_sample_columns + [
+    'Top offset (cm)', 'Bottom offset (cm)', 'Top depth CSF-A (m)', 'Bottom depth CSF-A (m)',
+    'Top depth CSF-B (m)', 'Bottom depth CSF-B (m)', '(mM) IC', '(µM) SPEC',
+    'Al (uM) 309.3 nm ICPAES', 'Alkalinity (mM) ALKALINITY', 'AMMONIUM (mM) DA',
+    'ammonium (mM) TITRA_MAN', 'Ammonium (µM) SPEC', 'AMMONIUM (µM) SPEC',
+    'ammonium (µM) SPEC', 'AMMONIUM_TEST (mM) DA', 'B (uM)  nm ICPAES',
+    'B (uM) 0 nm ICPAES', 'B (uM) 208.9 nm ICPAES', 'B (uM) 209 nm ICPAES',
+    'B (uM) 249.7 nm ICPAES', 'B (uM) 249.8 nm ICPAES', 'B (uM) unkn nm ICPAES',
+    'Ba (uM)  nm ICPAES', 'Ba (uM) 0 nm ICPAES', 'Ba (uM) 208.9 nm ICPAES',
+    'Ba (uM) 209 nm ICPAES', 'Ba (uM) 233.5 nm ICPAES', 'Ba (uM) 249.7 nm ICPAES',
+    'Ba (uM) 249.8 nm ICPAES', 'Ba (uM) 455.4 nm ICPAES', 'Ba (uM) 493.4 nm ICPAES',
+    'Ba (uM) unkn nm ICPAES', 'Bromide (mM) IC', 'bromide (mM) IC', 'Ca (mM)  nm ICPAES',
+    'Ca (mM) 0 nm ICPAES', 'Ca (mM) 280.3 nm ICPAES', 'Ca (mM) 315.9 nm ICPAES',
+    'Ca (mM) 317.9 nm ICPAES', 'Ca (mM) 393.4 nm ICPAES', 'Ca (mM) 396.8 nm ICPAES',
+    'Ca (mM) 422.7 nm ICPAES', 'Calcium (mM) IC', 'calcium (mM) IC', 'Chloride (mM) IC',
+    'chloride (mM) IC', 'Chloride (mM) TITRA_MAN', 'Choride (mM) IC',
+    'Cs (nM) 0 nm ICPAES', 'Dissolved Inorganic Carbon (mM) TOC', 'Fe (uM)  nm ICPAES',
+    'Fe (uM) 0 nm ICPAES', 'Fe (uM) 238.2 nm ICPAES', 'Fe (uM) 239.6 nm ICPAES',
+    'Fe (uM) 259.9 nm ICPAES', 'Fe (uM) unkn nm ICPAES', 'Inorganic carbon (wt%) COUL',
+    'K (mM)  nm ICPAES', 'K (mM) 0 nm ICPAES', 'K (mM) 766.5 nm ICPAES',
+    'K (mM) 769.9 nm ICPAES', 'Li (uM)  nm ICPAES', 'Li (uM) 0 nm ICPAES',
+    'Li (uM) 610.4 nm ICPAES', 'Li (uM) 670.8 nm ICPAES', 'Li (uM) unkn nm ICPAES',
+    'Magnesium (mM) IC', 'magnesium (mM) IC', 'Mg (mM)  nm ICPAES', 'Mg (mM) 0 nm ICPAES',
+    'Mg (mM) 279.6 nm ICPAES', 'Mg (mM) 280.3 nm ICPAES', 'Mg (mM) 285.2 nm ICPAES',
+    'Mg (mM) 396.8 nm ICPAES', 'Mn (uM)  nm ICPAES', 'Mn (uM) 0 nm ICPAES',
+    'Mn (uM) 249.8 nm ICPAES', 'Mn (uM) 257.6 nm ICPAES', 'Mn (uM) 259.4 nm ICPAES',
+    'Mn (uM) unkn nm ICPAES', 'Mo (nM) 0 nm ICPAES', 'n.a. (mM) IC', 'Na (mM)  nm ICPAES',
+    'Na (mM) 0 nm ICPAES', 'Na (mM) 401.8 nm ICPAES', 'Na (mM) 589 nm ICPAES',
+    'Na (mM) 589.6 nm ICPAES', 'nitrate (µM) SPEC', 'Nitrate/Nitrite (µM) SPEC',
+    'NITRATE_CD (mM) DA', 'NITRATE_LOW (mM) DA', 'NITRITES_TEST (mM) DA', 'pH ALKALINITY',
+    'PHOSPHATE (mM) DA', 'Phosphate (mM) DA', 'phosphate (µM) SPEC',
+    'phosphate (µM) TITRA_MAN', 'Potassium (mM) IC', 'potassium (mM) IC',
+    'Rb (uM) 0 nm ICPAES', 'S (mM)  nm ICPAES', 'S (mM) 0 nm ICPAES', 'Salinity SALINITY',
+    'Si (uM)  nm ICPAES', 'Si (uM) 0 nm ICPAES', 'Si (uM) 250.7 nm ICPAES',
+    'Si (uM) 251.6 nm ICPAES', 'Si (uM) 288.2 nm ICPAES', 'Si (uM) unkn nm ICPAES',
+    'SILICA (mM) DA', 'Silica (mM) DA', 'silica (µM) SPEC', 'SILICAPD (mM) DA',
+    'SO4 (mM)  nm ICPAES', 'SO4 (mM) 0 nm ICPAES', 'Sodium (mM) IC', 'sodium (mM) IC',
+    'Sr (uM)  nm ICPAES', 'Sr (uM) 0 nm ICPAES', 'Sr (uM) 407.8 nm ICPAES',
+    'Sr (uM) 421.6 nm ICPAES', 'Sr (uM) 460.7 nm ICPAES', 'Sr (uM) unkn nm ICPAES',
+    'Sulfate (mM) IC', 'sulfate (mM) IC', 'sulfide (µM) SPEC', 'sulfide (µM) TITRA_MAN',
+    'Total Carbon (ppm) TOC', 'Total Organic Carbon (wt%) TOC', 'U (nM) 0 nm ICPAES',
+    'V (nM) 0 nm ICPAES', 'Proceedings label', 'Comments', '', '', '']
+
+# Analyses reported for most IODP pore water samples
+iodp_iw_common = [
+    'Alkalinity (mM) ALKALINITY', 'pH ALKALINITY', 'Salinity SALINITY', 'Chloride (mM) IC',
+    'Sulfate (mM) IC', 'Sodium (mM) IC', 'Magnesium (mM) IC', 'Calcium (mM) IC',
+    'Potassium (mM) IC', 'Bromide (mM) IC', 'Ammonium (µM) SPEC', 'phosphate (µM) SPEC',
+    'B (uM) 249.7 nm ICPAES', 'Ba (uM) 455.4 nm ICPAES', 'Fe (uM) 259.9 nm ICPAES',
+    'Li (uM) 670.8 nm ICPAES', 'Mn (uM) 257.6 nm ICPAES', 'Si (uM) 251.6 nm ICPAES',
+    'Sr (uM) 421.6 nm ICPAES']
+
+iodp_mad_columns = iodp_sample_columns + [
+    'Offset (cm)', 'Depth CSF-A (m)', 'Depth CSF-B (m)', 'Submethod', 'Moisture wet (wt%)',
+    'Moisture dry (wt%)', 'Bulk density (g/cm³)', 'Dry density (g/cm³)',
+    'Grain density (g/cm³)', 'Porosity (vol%)', 'Void ratio', 'Container no.',
+    'Mass wet sample + cont (g)', 'Mass dried sample + cont (g)',
+    'Vol wet sample + cont (cm³)', 'Vol dried sample + cont (cm³)', 'Mass wet sample (g)',
+    'Mass dried sample (g)', 'Mass porewater (g)', 'Mass salt (g)', 'Mass solids (g)',
+    'Vol wet sample (cm³)', 'Vol dried sample (cm³)', 'Vol porewater   (cm³)',
+    'Vol salt (cm³)', 'Vol solids (cm³)', 'Timestamp (UTC)', 'Proceedings label',
+    'Comments']
+
+iodp_carbon_columns = iodp_sample_columns + [
+    'Top offset on section (cm)', 'Bot offset on section (cm)', 'Top depth CSF-A (m)',
+    'Top depth CSF-B (m)', 'Inorganic carbon (wt%)', 'Calcium carbonate (wt%)',
+    'Total carbon (wt%)', 'Hydrogen (wt%)', 'Nitrogen (wt%)', 'Sulfur (wt%)',
+    'Organic carbon (wt%), CHNS with treated sample (wt%)',
+    'Organic carbon (wt%) by difference (CHNS-COUL)',
+    'Sample treatment method (CHNS organic carbon)', 'Comments', '']
+
+# Positional: the union of these columns over all workbooks is what
+# load_iodp_age_depth maps to standard names by column order
+age_control_columns = [
+    'A/W', 'Bottom Depth [m]', 'Bottom Depth[m] [m]', 'Bottom [cm]', 'Bottom depth [m]',
+    'Bottom[cm] [cm]', 'Core', 'Core-Sect', 'DATUM NAME', 'Datum', 'Datum Age [Ma]',
+    'Datum age (old) [Ma]', 'Datum age (young) [Ma]', 'Datum age average [Ma]',
+    'Datum age maximum [Ma]', 'Datum age minimum [Ma]', 'Datum age old [Ma]',
+    'Datum age young [Ma]', 'Datum author [year]', 'Datum author year', 'Datum comment',
+    'Datum group', 'Datum group code', 'Datum name', 'Datum name [generic]',
+    'Datum name generic', 'Datum region', 'Datum status', 'Datum type',
+    'Datum validation comment', 'Exp', 'Extra Sample ID Data', 'File Data',
+    'Generic datum name', 'Hole', 'Label ID', 'Marker species', 'Piece', 'Sample',
+    'Section', 'Ship File Links', 'Site', 'Top Depth [m]', 'Top Depth[m] [m]', 'Top [cm]',
+    'Top depth [m]', 'Top[cm] [cm]', 'Type', 'Unnamed: 0', 'Unnamed: 29',
+    'datum_age_old[Ma] [Ma]', 'datum_age_young[Ma] [Ma]', 'datum_author_year',
+    'datum_group', 'datum_group_code', 'datum_name', 'datum_name_generic', 'datum_status',
+    'datum_type', 'datum_validation_comment', 'dupes and comments']
+
+fossil_groups = ['nannofossil', 'planktic_foram', 'radiolaria', 'diatom', 'benthic_foram']
+
+chikyu_meta_columns = ['EXPNAME', 'HOLENAME', 'LAT', 'LON', 'WTRDEPTH', 'STARTDATE', 'ENDDATE']
+
+# Sample identifiers of the J-CORES exports
+chikyu_sample_columns = [
+    'Top Core Depth []', 'Top Drilling depth below sea floor [m DSF]',
+    'Top Depth DSF, MSF, WSF and CSF-B [m, CMP]', 'Top Core depth (below sea floor) [m CSF-A]',
+    'Top Core depth (below sea floor) [m CSF-B]', 'Top Depth DSF, MSF, WSF and CSF-A [m]',
+    'Bottom Core Depth []', 'Bottom Drilling depth below sea floor [m DSF]',
+    'Bottom Depth DSF, MSF, WSF and CSF-B [m, CMP]',
+    'Bottom Core depth (below sea floor) [m CSF-A]',
+    'Bottom Core depth (below sea floor) [m CSF-B]', 'Bottom Depth DSF, MSF, WSF and CSF-A [m]',
+    'Sample source', 'J-CORES sample ID', 'Sample code', 'Sample request',
+    'Sample volume (cm3)', 'Sample entered by', 'Sample comment', 'Sample repository',
+    'Sample time-stamp']
+
+# Every analysis read by load_chikyu_iw, which needs all of them across the files
+chikyu_iw_analyte_columns = [
+    'pore water chemistry; sample::refractive index nD: refractometer::number',
+    'pore water chemistry; sample::chlorinity: titrator, potentiometric titration [mM]::number',
+    'pore water chemistry; sample::Li concentration: ICP-AES [µM]::number',
+    'pore water chemistry; sample::B concentration: ICP-AES [µM]::number',
+    'pore water chemistry; sample::NH4 concentration: UV-Visible spectrophotometer [mM]::number',
+    'pore water chemistry; sample::Na concentration: IC [mM]::number',
+    'pore water chemistry; sample::Mg concentration: IC [mM]::number',
+    'pore water chemistry; sample::Si concentration: ICP-AES [µM]::number',
+    'pore water chemistry; sample::Si concentration: UV-Visible spectrophotometer [mM]::number',
+    'pore water chemistry; sample::PO4 concentration: UV-Visible spectrophotometer [µM]::number',
+    'pore water chemistry; sample::SO4 concentration: IC [mM]::number',
+    'pore water chemistry; sample::K concentration: IC [mM]::number',
+    'pore water chemistry; sample::Ca concentration: IC [mM]::number',
+    'pore water chemistry; sample::Mn concentration: ICP-AES [µM]::number',
+    'pore water chemistry; sample::Fe concentration: ICP-AES [µM]::number',
+    'pore water chemistry; sample::Zn concentration: ICP-MS [nM]::number',
+    'pore water chemistry; sample::Br concentration: IC [mM]::number',
+    'pore water chemistry; sample::Rb concentration: ICP-MS [nM]::number',
+    'pore water chemistry; sample::Sr concentration: ICP-AES [µM]::number',
+    'pore water chemistry; sample::Mo concentration: ICP-MS [nM]::number',
+    'pore water chemistry; sample::Cs concentration: ICP-MS [nM]::number',
+    'pore water chemistry; sample::Ba concentration: ICP-AES [µM]::number',
+    'pore water chemistry; sample::U concentration: ICP-MS [nM]::number',
+    'pore water chemistry::pmH: pH electrode, attached to titrator::number',
+    'pore water chemistry::alkalinity: titrator [mM]::number',
+    'pore water chemistry; sample::V concentration: ICP-MS [nM]::number',
+    'pore water chemistry; sample::Cu concentration: ICP-MS [nM]::number',
+    'pore water chemistry; sample::Pb concentration: ICP-MS [nM]::number',
+    'pore water chemistry::refractive index nD: refractometer::number',
+    'pore water chemistry::salinity: refractometer [permil]::number',
+    'pore water chemistry::PO4 concentration: UV-Visible spectrophotometer [µM]::number',
+    'pore water chemistry::NH4 concentration: UV-Visible spectrophotometer [mM]::number',
+    'pore water chemistry::Cl concentration: IC [mM]::number',
+    'pore water chemistry::Br concentration: IC [mM]::number',
+    'pore water chemistry::NO3 concentration: IC [mM]::number',
+    'pore water chemistry::SO4 concentration: IC [mM]::number',
+    'pore water chemistry::Na concentration: IC [mM]::number',
+    'pore water chemistry::K concentration: IC [mM]::number',
+    'pore water chemistry::Mg concentration: IC [mM]::number',
+    'pore water chemistry::Ca concentration: IC [mM]::number',
+    'pore water chemistry::B concentration: ICP-AES [µM]::number',
+    'pore water chemistry::Ba concentration: ICP-AES [µM]::number',
+    'pore water chemistry::Fe concentration: ICP-AES [µM]::number',
+    'pore water chemistry::Li concentration: ICP-AES [µM]::number',
+    'pore water chemistry::Mn concentration: ICP-AES [µM]::number',
+    'pore water chemistry::Si concentration: ICP-AES [µM]::number',
+    'pore water chemistry::Sr concentration: ICP-AES [µM]::number',
+    'pore water chemistry::chlorinity: titrator, potentiometric titration [mM]::number',
+    'pore water chemistry::V concentration: ICP-MS [nM]::number',
+    'pore water chemistry::Cu concentration: ICP-MS [nM]::number',
+    'pore water chemistry::Zn concentration: ICP-MS [nM]::number',
+    'pore water chemistry::Rb concentration: ICP-MS [nM]::number',
+    'pore water chemistry::Mo concentration: ICP-MS [nM]::number',
+    'pore water chemistry::Cs concentration: ICP-MS [nM]::number',
+    'pore water chemistry::Pb concentration: ICP-MS [nM]::number',
+    'pore water chemistry::U concentration: ICP-MS [nM]::number',
+    'pore water chemistry; sample::NH4 concentration: UV-Visible spectrophotometer [µM]::number',
+    'pore water chemistry; sample::Na concentration: ICP-AES [mM]::number',
+    'pore water chemistry; sample::Mg concentration: ICP-AES [mM]::number',
+    'pore water chemistry; sample::K concentration: ICP-AES [mM]::number',
+    'pore water chemistry; sample::Ca concentration: ICP-AES [mM]::number',
+    'pore water chemistry; sample::Br concentration: IC [µM]::number',
+    'pore water chemistry; sample::salinity: refractometer [permil]::number',
+    'pore water chemistry; sample::Na concentration: charge balance [mM]::number',
+    'pore water chemistry; sample::SO4 concentration: selected from IC without or with Cd(NO3)2 [mM]::number',
+    'pore water chemistry; sample::SO4 concentration: IC with Cd(NO3)2 [mM]::number',
+    'pore water chemistry; sample::Cl concentration: chlorinity - Br [mM]::number',
+    'pore water chemistry; sample::Rb concentration: ICP-MS [µM]::number',
+    'pore water chemistry; sample::NO2 concentration: IC [mM]::number',
+    'pore water chemistry; sample::NO3 concentration: IC [mM]::number',
+    'pore water chemistry; sample::HS concentration: spectrophotometer, 3rd party [µM]::number',
+    'pore water chemistry; sample::Fe(II) concentration: spectrophotometer, 3rd party [µM]::number',
+    'pore water chemistry; sample::DIC concentration: coulometer, DIC-EXIT, 3rd party [mM]::number']
+
+chikyu_iw_columns = chikyu_sample_columns + chikyu_iw_analyte_columns + [
+    'pore water chemistry::comment on measurement::text',
+    'pore water chemistry::registerer', 'pore water chemistry::registration time-stamp']
+
+chikyu_mad_columns = chikyu_sample_columns + [
+    'moisture and density::wet sample beaker ID::text',
+    'moisture and density::wet sample beaker mass [g]::number',
+    'moisture and density::wet bulk mass [g]::number',
+    'moisture and density::dry bulk mass [g]::number',
+    'moisture and density::pore water mass [g]::number',
+    'moisture and density::salt mass [g]::number',
+    'moisture and density::water content wet::number',
+    'moisture and density::water content dry::number',
+    'moisture and density::bulk density [g/cm3]::number',
+    'moisture and density::dry density [g/cm3]::number',
+    'moisture and density::grain density [g/cm3]::number',
+    'moisture and density::porosity::number',
+    'moisture and density::void ratio::number',
+    'moisture and density::registerer', 'moisture and density::registration time-stamp']
+
+chikyu_carbon_columns = chikyu_sample_columns + [
+    'bulk CNS analysis; sample, section::inorganic carbon content: carbonate analyzer [wt%]::number',
+    'bulk CNS analysis; sample, section::CaCO3 content: from inorganic carbon content [wt%]::number',
+    'bulk CNS analysis; sample, section::registerer',
+    'bulk CNS analysis; sample, section::registration time-stamp',
+    'bulk CNS analysis::nitrogen content: EA, bulk [wt%]::number',
+    'bulk CNS analysis::total carbon content: EA, bulk [wt%]::number',
+    'bulk CNS analysis::sulfur content: EA, bulk [wt%]::number',
+    'bulk CNS analysis::measurement date-time: EA, bulk::text',
+    'bulk CNS analysis::registerer', 'bulk CNS analysis::registration time-stamp']
+
+
+def table(columns, values, n_rows):
+    # Frame of columns in file order, blank where values has no entry. Columns
+    # may repeat (e.g. unnamed trailing columns).
+    frame = pd.DataFrame({n: values.get(col, '') for n, col in enumerate(columns)},
+                         index=range(n_rows))
+    frame.columns = columns
+    return frame
+
+def fmt(values, spec='{:.2f}', blank=None):
+    # Text of values, blank where blank is True
+    text = pd.Series(np.asarray(values)).map(spec.format)
+    if blank is not None:
+        text = text.mask(np.asarray(blank), '')
+    return text
+
+def pad(values, width):
+    # Right-aligned fixed-width text, as in the Janus (ODP) downloads
+    return pd.Series(np.asarray(values)).astype(str).str.rjust(width)
+
+def measured(rng, n_rows, low, high, decimals=2, fill=1.0, width=None):
+    values = fmt(rng.uniform(low, high, n_rows), '{:.%df}' % decimals, rng.random(n_rows) >= fill)
+    return values if width is None else pad(values, width)
+
+def write_table(frame, path, sep, encoding='utf-8', lineterminator='\n', blank_line=False):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding=encoding, newline='') as f:
+        # Janus files have an empty line between header and data
+        if blank_line == True:
+            f.write(sep.join(frame.columns) + lineterminator * 2)
+        frame.to_csv(f, sep=sep, index=False, header=(blank_line == False),
+                     lineterminator=lineterminator)
+
+
+def make_holes(rng, n_holes):
+    # Site index and rank within its site (1-4 holes per site) of every hole,
+    # with site coordinates and water depths and hole penetrations
+    sizes = rng.integers(1, 5, n_holes)
+    n_sites = int(np.searchsorted(np.cumsum(sizes), n_holes)) + 1
+    sizes = sizes[:n_sites]
+    sizes[-1] -= sizes.sum() - n_holes
+    site = np.repeat(np.arange(n_sites), sizes)
+    rank = np.arange(n_holes) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    return pd.DataFrame({'site_index': site, 'rank': rank,
+                         'lat': rng.uniform(-70, 70, n_sites)[site],
+                         'lon': rng.uniform(-180, 180, n_sites)[site],
+                         'water_depth': rng.uniform(100, 6000, n_sites).round(1)[site],
+                         'penetration': rng.uniform(20, 1200, n_holes).round(1)})
+
+def program_holes(rng, program, scale, first_site=1):
+    # Hole catalogue of a program, with leg, site, and hole IDs as in its files
+    holes = make_holes(rng, base_holes[program] * scale)
+    site = holes['site_index'].to_numpy()
+    rank = holes['rank'].to_numpy()
+    n_sites = site.max() + 1
+    if program == 'dsdp':
+        holes['leg'] = (1 + site * 96 // n_sites).astype(str)
+        holes['site'] = (first_site + site).astype(str)
+        holes['hole'] = np.where(rank == 0, '', letters[np.maximum(rank - 1, 0)])
+    elif program == 'odp':
+        holes['leg'] = (100 + site * 111 // n_sites).astype(str)
+        holes['site'] = (first_site + site).astype(str)
+        holes['hole'] = letters[rank]
+    elif program == 'iodp':
+        # Expeditions 302 and 335 are special-cased in compile_metadata
+        exps = [exp for exp in range(303, 303 + n_sites) if exp != 335]
+        n_exps = max(1, n_sites // 5)
+        holes['leg'] = np.array(exps)[site * n_exps // n_sites].astype(str)
+        # Five-character site IDs, U1301-U9999 then M0001-M9999
+        number = 1301 + site
+        if number.max() > 9999 + 9999:
+            raise ValueError('Too many IODP sites for five-character site IDs.')
+        holes['site'] = np.where(number <= 9999, 'U' + pd.Series(number).astype(str),
+                                 'M' + pd.Series(number - 9999).astype(str).str.zfill(4))
+        holes['hole'] = letters[rank]
+    elif program == 'chikyu':
+        n_exps = max(1, n_sites // 4)
+        holes['leg'] = (901 + site * n_exps // n_sites).astype(str)
+        holes['site'] = 'C' + pd.Series(1 + site).astype(str).str.zfill(4)
+        holes['hole'] = letters[rank]
+    return holes
+
+def draw_samples(rng, holes, n_rows):
+    # n_rows samples spread over holes, sorted by hole and depth, with core,
+    # section, offset in section (cm), and row of the hole in holes
+    index = rng.integers(0, len(holes), n_rows)
+    depth = rng.uniform(0, 1, n_rows) * holes['penetration'].to_numpy()[index]
+    order = np.lexsort((depth, index))
+    samples = holes.iloc[index[order]].reset_index(drop=True)
+    samples['hole_index'] = index[order]
+    depth = depth[order].round(2)
+    core = (depth // 9.5).astype(int) + 1
+    in_core = depth - (core - 1) * 9.5
+    section = np.minimum(in_core // 1.5, 6).astype(int) + 1
+    samples['depth'] = depth
+    samples['core'] = core
+    samples['section'] = section
+    samples['offset'] = ((in_core - (section - 1) * 1.5) * 100).round(1)
+    return samples
+
+def duplicate_rows(rng, samples, fraction):
+    # Samples reported on more than one row (replicate analyses)
+    repeat = 1 + (rng.random(len(samples)) < fraction)
+    return samples.loc[samples.index.repeat(repeat)].reset_index(drop=True)
+
+
+def write_dsdp(rng, root, holes, scale):
+    n = len(holes)
+    write_table(table(dsdp_meta_columns, {
+        'leg': holes['leg'], 'site': holes['site'], 'hole': holes['hole'],
+        'latitude': fmt(holes['lat'], '{:.4f}'), 'longitude': fmt(holes['lon'], '{:.4f}'),
+        'water depth(m)': fmt(holes['water_depth'], '{:.0f}'),
+        'total penetration(m)': fmt(holes['penetration'], '{:.1f}'),
+        'well logging': np.where(rng.random(n) < 0.3, 'YES', 'NO'),
+        'ocean': 'PACIFIC', 'site termination': 'OBJECTIVE REACHED'}, n),
+        os.path.join(root, dfp.dsdp_meta), '\t')
+
+    # Pore water data cards: card 1 of every sample, other cards and replicate
+    # cards for some
+    n_samples = base_rows['dsdp_iw'] * scale * 10 // 24
+    samples = draw_samples(rng, holes, n_samples)
+    cards = [(1, 1.0), (1, 0.3), (2, 0.5), (2, 0.1), (3, 0.35), (4, 0.11), (5, 0.07), (6, 0.01)]
+    picked = [np.nonzero(rng.random(n_samples) < p)[0] for card, p in cards]
+    sample_index = np.concatenate(picked)
+    card_number = np.concatenate([np.full(len(rows), card) for (card, p), rows in zip(cards, picked)])
+    order = np.lexsort((card_number, sample_index))
+    sample_index, card_number = sample_index[order], card_number[order]
+    data = samples.iloc[sample_index].reset_index(drop=True)
+    n = len(data)
+    first = card_number == 1
+    values = {
+        'leg': data['leg'], 'site': data['site'], 'hole': data['hole'],
+        'core': data['core'], 'section': data['section'],
+        'top of sampled interval (cm)': fmt(data['offset'], '{:.1f}'),
+        'bottom of sampled interval(cm)': fmt(data['offset'] + 5, '{:.1f}'),
+        'depth to core (m)': fmt((data['core'] - 1) * 9.5, '{:.2f}'),
+        'depth to sample (m)': fmt(data['depth'], '{:.2f}'),
+        'card type': np.where(rng.random(n) < 0.01, 'COMMENT CARD', 'DATA CARD'),
+        'card number': card_number,
+        'pH': measured(rng, n, 6.8, 8.3, 2, 0.6).where(first, ''),
+        'alkalinity': measured(rng, n, 0.5, 40, 2, 0.6).where(first, ''),
+        'salinity': measured(rng, n, 30, 36, 1, 0.8).where(first, ''),
+        'reference': rng.integers(1, 400, n),
+    }
+    values['pH electrode type'] = np.where(values['pH'] != '', 'PUNCH-IN', '')
+    values['alkalinity measurement type'] = np.where(values['alkalinity'] != '', 'GRAN', '')
+    for field in range(1, 7):
+        text = measured(rng, n, 0.1, 60, 2, 0.6)
+        values['data field #%d' % field] = text.mask(rng.random(n) < 0.005, '.')
+    write_table(table(dsdp_iw_columns, values, n), os.path.join(root, dfp.dsdp_iw), '\t')
+
+    data = draw_samples(rng, holes, base_rows['dsdp_mad'] * scale)
+    n = len(data)
+    write_table(table(dsdp_mad_columns, {
+        'leg': data['leg'], 'site': data['site'], 'hole': data['hole'],
+        'core': data['core'], 'section': data['section'],
+        'top interval depth (cm)': fmt(data['offset'], '{:.1f}'),
+        'bottom interval depth (cm)': fmt(data['offset'], '{:.1f}'),
+        'top of core depth (m)': fmt((data['core'] - 1) * 9.5, '{:.2f}'),
+        'sample depth (m)': fmt(data['depth'], '{:.2f}'),
+        'wet water content (no units)': measured(rng, n, 10, 70, 2),
+        'porosity': measured(rng, n, 30, 85, 1, 0.7),
+        'wet bulk density (g/cc)': measured(rng, n, 1.2, 2.2, 2, 0.7),
+        'grain density (g/cc)': measured(rng, n, 2.5, 2.9, 2, 0.5)}, n),
+        os.path.join(root, dfp.dsdp_mad), '\t')
+
+    data = draw_samples(rng, holes, base_rows['dsdp_carbon'] * scale)
+    n = len(data)
+    write_table(table(dsdp_carbon_columns, {
+        'leg': data['leg'], 'site': data['site'], 'hole': data['hole'],
+        'core': data['core'], 'section': data['section'],
+        'top interval depth (cm)': fmt(data['offset'], '{:.1f}'),
+        'bottom interval depth (cm)': fmt(data['offset'], '{:.1f}'),
+        'top of core depth (m)': fmt((data['core'] - 1) * 9.5, '{:.2f}'),
+        'sample depth (m)': fmt(data['depth'], '{:.2f}'),
+        'percent total carbon': measured(rng, n, 0, 12, 1, 0.8),
+        'percent organic carbon': measured(rng, n, 0, 3, 1, 0.7),
+        'percent calcium carbonate (CaCO3)': measured(rng, n, 0, 95, 1, 0.9),
+        'method code': 'LECO 70-SECOND ANALYZER (total and/or organic)',
+        'data source code': 'DSDP SHORE LABORATORY'}, n),
+        os.path.join(root, dfp.dsdp_carbon), '\t')
+
+    # Age intervals, 0.5-50 m thick, on a per-hole sedimentation rate (Ma/m)
+    data = draw_samples(rng, holes, base_rows['dsdp_age_depth'] * scale)
+    n = len(data)
+    rate = rng.uniform(0.005, 0.05, len(holes))[data['hole_index']]
+    bottom = data['depth'] + rng.uniform(0.5, 50, n)
+    write_table(table(dsdp_age_depth_columns, {
+        'leg': data['leg'], 'site': data['site'], 'hole': data['hole'],
+        'age mnemonic': 'Quaternary',
+        'top of section depth(m)': fmt(data['depth'], '{:.1f}'),
+        'bottom of section depth(m)': fmt(bottom, '{:.1f}'),
+        'age': 'no age given', 'averaged age': 'no age given',
+        'age top of section(million years)': pad(fmt(data['depth'] * rate, '{:.2f}'), 5),
+        'age bottom of section(million years)': pad(fmt(bottom * rate, '{:.2f}'), 5),
+        'average age(million years)': pad(fmt((data['depth'] + bottom) / 2 * rate, '{:.3f}'), 5),
+        'data source': 'Initial Reports of the DSDP'}, n),
+        os.path.join(root, dfp.dsdp_age_depth), '\t')
+
+def odp_coordinate(values, positive, negative):
+    # e.g. "    25° 13.5'N"
+    degrees = np.floor(np.abs(values)).astype(int)
+    minutes = (np.abs(values) - degrees) * 60
+    text = (pd.Series(degrees).astype(str) + '° ' + fmt(minutes, '{:.1f}') + "'" +
+            pd.Series(np.where(values < 0, negative, positive)))
+    return text.str.rjust(14)
+
+def odp_samples(data):
+    # Janus sample identifiers, fixed width
+    return {'Leg': pad(data['leg'], 3), 'Site': pad(data['site'], 4), 'H': data['hole'],
+            'Cor': pad(data['core'], 3), 'T': 'H', 'Sc': pad(data['section'], 2),
+            'Top(cm)': pad(fmt(data['offset'], '{:.1f}'), 6),
+            'Bot(cm)': pad(fmt(data['offset'] + 2, '{:.1f}'), 6),
+            'Depth (mbsf)': pad(fmt(data['depth'], '{:.2f}'), 8)}
+
+def write_odp(rng, root, holes, scale):
+    n = len(holes)
+    # Some water depths are blank, so the column is read as text
+    water_depth = fmt(holes['water_depth'], '{:.1f}', rng.random(n) < 0.02)
+    write_table(table(odp_meta_columns, {
+        'Leg': pad(holes['leg'], 3), 'Site': pad(holes['site'], 4), 'Hole': holes['hole'],
+        '    Latitude': odp_coordinate(holes['lat'].to_numpy(), 'N', 'S'),
+        '    Longtitude': odp_coordinate(holes['lon'].to_numpy(), 'E', 'W'),
+        '    Water Depth': pad(water_depth, 15),
+        '    Total Penetration (m) ': pad(fmt(holes['penetration'], '{:.1f}'), 26),
+        '    Numbers of Cores': pad((holes['penetration'] // 9.5).astype(int), 20)}, n),
+        os.path.join(root, dfp.odp_meta), '\t', 'cp1252', '\r\n')
+
+    # Pore water analyses, some cells with two whitespace-separated entries
+    data = draw_samples(rng, holes, base_rows['odp_iw'] * scale)
+    n = len(data)
+    values = odp_samples(data)
+    for col in odp_iw_analyte_columns:
+        if col == 'Color':
+            values[col] = pd.Series(np.where(rng.random(n) < 0.05, 'clear', ''))
+            continue
+        fill = 0.6 if col.split()[0] in ('Ca', 'Cl', 'Mg', 'SO4', 'Alkalinity', 'pH', 'Salinity') else 0.1
+        text = measured(rng, n, 0.1, 600, 2, fill)
+        second = (text != '') & (rng.random(n) < 0.03)
+        text[second] = text[second] + ' ' + measured(rng, second.sum(), 0.1, 600, 2).values
+        values[col] = pad(text, 10)
+    write_table(table(odp_sample_columns + odp_iw_analyte_columns, values, n),
+                os.path.join(root, dfp.odp_iw), '\t', 'cp1252', '\r\n')
+
+    data = draw_samples(rng, holes, base_rows['odp_mad'] * scale)
+    n = len(data)
+    values = odp_samples(data)
+    values.update({'Method': pad(np.where(rng.random(n) < 0.8, 'C', 'B'), 6),
+                   'WC wet (%)': measured(rng, n, 10, 70, 1, width=10),
+                   'WC dry (%)': measured(rng, n, 10, 200, 1, width=10),
+                   'BD (g/cc)': measured(rng, n, 1.2, 2.2, 2, width=9),
+                   'DD (g/cc)': measured(rng, n, 0.5, 2.0, 2, width=9),
+                   'GD (g/cc)': measured(rng, n, 2.5, 2.9, 2, 0.9, 9),
+                   'PO (%)': measured(rng, n, 30, 85, 1, 0.95, 8),
+                   'VR': measured(rng, n, 0.4, 5, 2, width=6)})
+    write_table(table(odp_mad_columns, values, n), os.path.join(root, dfp.odp_mad),
+                '\t', 'cp1252', '\r\n')
+
+    data = draw_samples(rng, holes, base_rows['odp_carbon'] * scale)
+    n = len(data)
+    values = odp_samples(data)
+    values.update({'INOR_C (wt %)': measured(rng, n, 0, 12, 2, 0.9, 10),
+                   'CaCO3 (wt %)': measured(rng, n, 0, 95, 2, 0.9, 10),
+                   'TOT_C (wt %)': measured(rng, n, 0, 12, 2, 0.5, 10),
+                   'ORG_C (wt %)': measured(rng, n, 0, 3, 2, 0.5, 10),
+                   'N (wt %)': measured(rng, n, 0, 0.5, 2, 0.3, 10),
+                   'S (wt %)': measured(rng, n, 0, 2, 2, 0.3, 10),
+                   'H (mg HC/g)': measured(rng, n, 0, 5, 2, 0.1, 10)})
+    write_table(table(odp_carbon_columns, values, n), os.path.join(root, dfp.odp_carbon),
+                '\t', 'cp1252', '\r\n')
+
+    data = draw_samples(rng, holes, base_rows['odp_age_depth'] * scale)
+    n = len(data)
+    rate = rng.uniform(0.005, 0.05, len(holes))[data['hole_index']]
+    write_table(table(odp_age_depth_columns, {
+        'Leg': data['leg'], 'Site': pad(data['site'], 4), 'H': data['hole'],
+        'Age Model Type           ': 'Post Moratorium'.ljust(25),
+        'Depth (mbsf)': pad(fmt(data['depth'], '{:.3f}'), 12),
+        '    Age (Ma)': pad(fmt(data['depth'] * rate, '{:.6f}'), 12),
+        'Control Point Comment': 'FO Paragloborotalia pseudokugleri'}, n),
+        os.path.join(root, dfp.odp_age_depth), '\t', 'cp1252', '\r\n', blank_line=True)
+
+    # Datum depth ranges, a few longer than a core; some old ages blank
+    data = draw_samples(rng, holes, base_rows['odp_age_profile'] * scale)
+    n = len(data)
+    rate = rng.uniform(0.005, 0.05, len(holes))[data['hole_index']]
+    base = data['depth'] + np.where(rng.random(n) < 0.9, rng.uniform(0.1, 10, n), 20)
+    age = data['depth'] * rate
+    write_table(table(odp_age_profile_columns, {
+        'Leg': data['leg'], 'Site': data['site'], 'Hole': pad(data['hole'], 4),
+        'Ageprofile Fossil Group': pad(rng.integers(1, 6, n), 23),
+        'Ageprofile Depth Top': pad(fmt(data['depth'], '{:.2f}'), 20),
+        'Ageprofile Depth Base': pad(fmt(base, '{:.2f}'), 21),
+        'Ageprofile Age Young': pad(fmt(age, '{:.2f}'), 20),
+        'Ageprofile Age Old': pad(fmt(age * 1.05, '{:.2f}', rng.random(n) < 0.05), 20),
+        'Ageprofile Datum ID': pad(rng.integers(1000, 9999, n), 19),
+        'Ageprofile Datum Description'.ljust(80): 'Gephyrocapsa large'.ljust(80),
+        'Ageprofile Datum Type': 'FO'.ljust(21),
+        'Genus Subgenus'.ljust(80): 'Gephyrocapsa'.ljust(80),
+        'Species Subspecies'.ljust(80): 'large'.ljust(80),
+        'Depth Map Type': ' ' * 14, 'MCD Flag': ' ' * 8, 'Compression Flag': ' ' * 9}, n),
+        os.path.join(root, dfp.odp_age_profile), '\t', 'cp1252', '\r\n', blank_line=True)
+
+def iodp_coordinate(values, positive, negative):
+    # e.g. "44 53.0307 S"
+    degrees = np.floor(np.abs(values)).astype(int)
+    minutes = (np.abs(values) - degrees) * 60
+    return (pd.Series(degrees).astype(str) + ' ' + fmt(minutes, '{:.4f}') + ' ' +
+            pd.Series(np.where(values < 0, negative, positive)))
+
+def iodp_samples(data):
+    return {'Exp': data['leg'], 'Site': data['site'], 'Hole': data['hole'],
+            'Core': data['core'], 'Type': 'H', 'Sect': data['section'], 'A/W': 'W'}
+
+def proceedings_label(data, bottom):
+    return (data['site'] + data['hole'] + '-' + data['core'].astype(str) + 'H-' +
+            data['section'].astype(str) + ', ' + fmt(data['offset'], '{:.1f}') + '-' +
+            fmt(bottom, '{:.1f}') + ' cm')
+
+def write_iodp(rng, root, holes, scale):
+    n = len(holes)
+    write_table(table(iodp_meta_columns, {
+        'Exp': holes['leg'], 'Site': holes['site'], 'Hole': holes['hole'],
+        'Latitude': iodp_coordinate(holes['lat'].to_numpy(), 'N', 'S'),
+        'Longitude': iodp_coordinate(holes['lon'].to_numpy(), 'E', 'W'),
+        'Water depth (m)': fmt(holes['water_depth'], '{:.2f}'),
+        'Penetration DSF (m)': fmt(holes['penetration'], '{:.1f}'),
+        'Drilled interval (m)': 'NULL', 'Date started (UTC)': '11/18/2009 9:30',
+        'Date finished (UTC)': '11/18/2009 23:30'}, n),
+        os.path.join(root, dfp.iodp_meta), ',')
+
+    # Pore water analyses, with replicate rows, comma-separated replicate entries
+    # in a cell, and detection-limit flags
+    data = duplicate_rows(rng, draw_samples(rng, holes, base_rows['iodp_iw'] * scale * 50 // 51), 0.02)
+    n = len(data)
+    bottom = data['offset'] + 10
+    values = iodp_samples(data)
+    values.update({'Top offset (cm)': fmt(data['offset'], '{:.0f}'),
+                   'Bottom offset (cm)': fmt(bottom, '{:.0f}'),
+                   'Top depth CSF-A (m)': fmt(data['depth'], '{:.2f}'),
+                   'Bottom depth CSF-A (m)': fmt(data['depth'] + 0.1, '{:.2f}'),
+                   'Top depth CSF-B (m)': fmt(data['depth'], '{:.2f}'),
+                   'Bottom depth CSF-B (m)': fmt(data['depth'] + 0.1, '{:.2f}'),
+                   'Proceedings label': proceedings_label(data, bottom),
+                   'Comments': np.where(rng.random(n) < 0.02, 'squeezed', '')})
+    for col in iodp_iw_columns[13:-5]:
+        text = measured(rng, n, 0.1, 600, 3, 0.6 if col in iodp_iw_common else 0.01)
+        second = (text != '') & (rng.random(n) < 0.03)
+        text[second] = text[second] + ',' + measured(rng, second.sum(), 0.1, 600, 3).values
+        flag = (text != '') & (rng.random(n) < 0.01)
+        text[flag] = rng.choice(['bdl', 'nd', 'BDL', '<0.5', '-'], flag.sum())
+        values[col] = text
+    write_table(table(iodp_iw_columns, values, n), os.path.join(root, dfp.iodp_iw), ',')
+
+    data = draw_samples(rng, holes, base_rows['iodp_mad'] * scale)
+    n = len(data)
+    values = iodp_samples(data)
+    values.update({'Offset (cm)': fmt(data['offset'], '{:.0f}'),
+                   'Depth CSF-A (m)': fmt(data['depth'], '{:.2f}'),
+                   'Depth CSF-B (m)': fmt(data['depth'], '{:.2f}'),
+                   'Submethod': 'C',
+                   'Moisture wet (wt%)': measured(rng, n, 10, 70, 1),
+                   'Moisture dry (wt%)': measured(rng, n, 10, 200, 1),
+                   'Bulk density (g/cm³)': measured(rng, n, 1.2, 2.2, 3),
+                   'Dry density (g/cm³)': measured(rng, n, 0.5, 2.0, 3),
+                   'Grain density (g/cm³)': measured(rng, n, 2.5, 2.9, 3, 0.95),
+                   'Porosity (vol%)': measured(rng, n, 30, 85, 1, 0.95),
+                   'Void ratio': measured(rng, n, 0.4, 5, 3),
+                   'Proceedings label': proceedings_label(data, data['offset'] + 2)})
+    write_table(table(iodp_mad_columns, values, n), os.path.join(root, dfp.iodp_mad), ',')
+
+    data = draw_samples(rng, holes, base_rows['iodp_carbon'] * scale)
+    n = len(data)
+    values = iodp_samples(data)
+    values.update({'Top offset on section (cm)': fmt(data['offset'], '{:.1f}'),
+                   'Bot offset on section (cm)': fmt(data['offset'] + 2, '{:.1f}'),
+                   'Top depth CSF-A (m)': fmt(data['depth'], '{:.3f}'),
+                   'Top depth CSF-B (m)': fmt(data['depth'], '{:.3f}'),
+                   'Inorganic carbon (wt%)': measured(rng, n, 0, 12, 3, 0.8),
+                   'Calcium carbonate (wt%)': measured(rng, n, 0, 95, 3, 0.8),
+                   'Total carbon (wt%)': measured(rng, n, 0, 12, 4, 0.6),
+                   'Hydrogen (wt%)': measured(rng, n, 0, 1, 2, 0.5),
+                   'Nitrogen (wt%)': measured(rng, n, 0, 0.5, 4, 0.6),
+                   'Sulfur (wt%)': measured(rng, n, 0, 2, 4, 0.6),
+                   'Organic carbon (wt%) by difference (CHNS-COUL)': measured(rng, n, 0, 3, 2, 0.5)})
+    values['Nitrogen (wt%)'] = values['Nitrogen (wt%)'].mask(rng.random(n) < 0.01, 'bdl')
+    write_table(table(iodp_carbon_columns, values, n), os.path.join(root, dfp.iodp_carbon), ',')
+
+    # Biostratigraphy workbooks, one hole and fossil group each, with an
+    # 'Age Control' sheet
+    n_books = base_files['iodp_age_depth'] * scale
+    books = holes.iloc[rng.choice(len(holes), n_books, replace=n_books > len(holes))]
+    books = books.reset_index(drop=True)
+    os.makedirs(os.path.join(root, dfp.iodp_age_depth), exist_ok=True)
+    for n, hole in books.iterrows():
+        data = draw_samples(rng, books.iloc[[n]], datums_per_workbook)
+        data = data.sort_values('depth').reset_index(drop=True)
+        m = len(data)
+        rate = rng.uniform(0.005, 0.05)
+        depth_bottom = data['depth'] + np.where(rng.random(m) < 0.9, rng.uniform(0.1, 10, m), 15)
+        age = (data['depth'] + depth_bottom) / 2 * rate
+        label = (data['leg'] + '-' + data['site'] + data['hole'] + '-' + data['core'].astype(str) +
+                 'H-' + data['section'].astype(str) + '-W ' + fmt(data['offset'], '{:.0f}'))
+        values = {}
+        for col in age_control_columns:
+            name = col.lower()
+            if '[m]' in name:
+                values[col] = (depth_bottom if 'bottom' in name else data['depth']).round(2)
+            elif '[cm]' in name:
+                values[col] = data['offset'] + (2 if 'bottom' in name else 0)
+            elif '[ma]' in name:
+                if 'old' in name or 'maximum' in name:
+                    values[col] = (age * 1.05).round(3)
+                elif 'young' in name or 'minimum' in name:
+                    values[col] = (age * 0.95).round(3)
+                else:
+                    values[col] = age.round(3)
+            elif col in ('Label ID', 'Sample'):
+                values[col] = label
+            elif col in ('Exp', 'Site', 'Hole', 'Core'):
+                values[col] = data[col.lower() if col != 'Exp' else 'leg']
+            elif col == 'Section':
+                values[col] = data['section']
+            else:
+                values[col] = 'x'
+        # Some old ages given as ranges
+        ranges = rng.random(m) < 0.05
+        values['Datum age (old) [Ma]'] = values['Datum age (old) [Ma]'].astype(object)
+        values['Datum age (old) [Ma]'][ranges] = (fmt(age[ranges] * 1.05, '{:.2f}') + '-' +
+                                                  fmt(age[ranges] * 1.1, '{:.2f}')).values
+        group = fossil_groups[n % len(fossil_groups)]
+        path = os.path.join(root, dfp.iodp_age_depth, '{}_{}_{}{}_{}.xlsx'.format(
+            hole['leg'], group, hole['site'], hole['hole'], n))
+        table(age_control_columns, values, m).to_excel(path, sheet_name='Age Control', index=False)
+
+def chikyu_samples(rng, data):
+    n = len(data)
+    hole_id = data['site'] + data['hole']
+    section = hole_id + '-' + data['core'].astype(str) + 'R-' + data['section'].astype(str)
+    bottom = data['depth'] + rng.uniform(0.01, 0.4, n).round(2)
+    values = {'Top Core Depth []': section + ', ' + fmt(data['offset'], '{:.1f}') + ' cm',
+              'Bottom Core Depth []': section + ', ' + fmt(data['offset'] + 1, '{:.1f}') + ' cm',
+              'Sample source': section + ' WR',
+              'J-CORES sample ID': 'CKY' + pd.Series(rng.integers(0, 10 ** 12, n)).astype(str).str.zfill(18),
+              'Sample code': 'IWIC', 'Sample volume (cm3)': 5, 'Sample entered by': 'user',
+              'Sample comment': np.where(rng.random(n) < 0.05, 'disturbed', ''),
+              'Sample repository': 'KCC', 'Sample time-stamp': '2010-07-05T05:34:34Z'}
+    for col in chikyu_sample_columns:
+        if col.startswith('Top') and col.endswith(']') and col != 'Top Core Depth []':
+            values[col] = fmt(data['depth'], '{:.3f}')
+        elif col.startswith('Bottom') and col.endswith(']') and col != 'Bottom Core Depth []':
+            values[col] = fmt(bottom, '{:.3f}')
+    return values
+
+def write_chikyu(rng, root, holes, scale):
+    n = len(holes)
+    # The first row under the header is skipped by compile_metadata
+    meta = table(chikyu_meta_columns, {
+        'EXPNAME': holes['leg'], 'HOLENAME': holes['site'] + holes['hole'],
+        'LAT': fmt(holes['lat'], '{:.5f}'), 'LON': fmt(holes['lon'], '{:.5f}'),
+        'WTRDEPTH': fmt(holes['water_depth'], '{:.1f}'),
+        'STARTDATE': '2007-11-20', 'ENDDATE': '2007-11-25'}, n)
+    units = pd.DataFrame([['Expedition', 'Hole', 'deg', 'deg', 'm', 'UTC', 'UTC']],
+                         columns=chikyu_meta_columns)
+    write_table(pd.concat([units, meta], ignore_index=True), os.path.join(root, dfp.chikyu_meta), ',')
+
+    # One file per hole and dataset, named as downloaded from the data portal
+    for name, directory, columns, filename in [
+            ('chikyu_iw', dfp.chikyu_iw, chikyu_iw_columns, 'bulk-pore-water-chemistry'),
+            ('chikyu_mad', dfp.chikyu_mad, chikyu_mad_columns, 'bulk-moisture-density'),
+            ('chikyu_carbon', dfp.chikyu_carbon, chikyu_carbon_columns, 'bulk-bulk-cns-analysis')]:
+        n_files = base_files[name] * scale
+        rows_per_file = base_rows[name] // base_files[name]
+        file_holes = holes.iloc[rng.choice(n, n_files, replace=n_files > n)]
+        for n_file, (_, hole) in enumerate(file_holes.iterrows()):
+            data = draw_samples(rng, file_holes.iloc[[n_file]], max(1, rng.poisson(rows_per_file)))
+            m = len(data)
+            values = chikyu_samples(rng, data)
+            for col in columns[len(chikyu_sample_columns):]:
+                if col.endswith('::number'):
+                    fill = 0.9 if ('porosity' in col or 'grain density' in col or
+                                   'carbon' in col or 'CaCO3' in col) else 0.15
+                    values[col] = measured(rng, m, 0.01, 600, 4, fill)
+                elif col.endswith('registerer'):
+                    values[col] = 'user'
+                elif col.endswith('time-stamp'):
+                    values[col] = '2008-02-04T22:16:45Z'
+            path = os.path.join(root, directory, '{} ({}).csv'.format(filename, n_file + 1))
+            write_table(table(columns, values, m), path, ',')
+
+
+def generate(root, scale=1, seed=0):
+    # Write a synthetic data/ tree under root at scale times the current holes
+    # and samples
+    rng = np.random.default_rng(seed)
+    dsdp = program_holes(rng, 'dsdp', scale)
+    odp = program_holes(rng, 'odp', scale, first_site=int(dsdp['site'].astype(int).max()) + 1)
+    iodp = program_holes(rng, 'iodp', scale)
+    chikyu = program_holes(rng, 'chikyu', scale)
+    write_dsdp(rng, root, dsdp, scale)
+    write_odp(rng, root, odp, scale)
+    write_iodp(rng, root, iodp, scale)
+    write_chikyu(rng, root, chikyu, scale)
+    return {'dsdp': len(dsdp), 'odp': len(odp), 'iodp': len(iodp), 'chikyu': len(chikyu)}
+
+# eof
@@ -16,11 +16,18 @@ import pandas as pd
 import numpy as np
 
 from ocean_drilling_db import data_filepaths as dfp
-
-def load_dsdp_cns():
-    # Read in data and rename columns
-    dsdp_data = pd.read_csv(dfp.dsdp_carbon, sep="\t", header=0,
-                            skiprows=None, encoding='windows-1252')
+from ocean_drilling_db import schema
+from ocean_drilling_db import streaming
+from ocean_drilling_db.pipeline import run_loaders
+
+def load_dsdp_cns(memory_budget=None):
+    # Read in data, in chunks if there is a memory budget (MB)
+    chunks = streaming.read_csv(dfp.dsdp_carbon, memory_budget, sep="\t", header=0,
+                                skiprows=None, encoding='windows-1252')
+    return streaming.collect(map(standardize_dsdp_cns, chunks), schema.cns)
+
+def standardize_dsdp_cns(dsdp_data):
+    # Rename columns
     dsdp_data = dsdp_data.rename(columns={'sample depth (m)':'sample_depth',
                               'percent total carbon':'total_carbon',
                               'percent organic carbon':'organic_carbon',
@@ -33,13 +40,17 @@ def load_dsdp_cns():
         if dsdp_data[col].dtype == object:
             dsdp_data[col] = dsdp_data[col].str.strip()
     dsdp_data = dsdp_data.replace('', np.nan)
-    return dsdp_data
+    return schema.enforce(dsdp_data, schema.cns)
+
 
+def load_odp_cns(memory_budget=None):
+    # Read in data, in chunks if there is a memory budget (MB)
+    chunks = streaming.read_csv(dfp.odp_carbon, memory_budget, sep="\t", header=0,
+                                skiprows=None, encoding='windows-1252', low_memory=False)
+    return streaming.collect(map(standardize_odp_cns, chunks), schema.cns)
 
-def load_odp_cns():
-    # Read in data and rename columns
-    odp_data = pd.read_csv(dfp.odp_carbon, sep="\t", header=0,
-                            skiprows=None, encoding='windows-1252', low_memory=False)
+def standardize_odp_cns(odp_data):
+    # Rename columns
     odp_data = odp_data.rename(columns={'Leg':'leg',
                                         'Site':'site',
                                         'H':'hole',
@@ -60,12 +71,16 @@ def load_odp_cns():
         if odp_data[col].dtype == object:
             odp_data[col] = odp_data[col].str.strip()
     odp_data = odp_data.replace('', np.nan)
-    return odp_data
+    return schema.enforce(odp_data, schema.cns)
+
+def load_iodp_cns(memory_budget=None):
+    # Read in data, in chunks if there is a memory budget (MB)
+    chunks = streaming.read_csv(dfp.iodp_carbon, memory_budget, sep=",", header=0,
+                                skiprows=None, encoding='windows-1252')
+    return streaming.collect(map(standardize_iodp_cns, chunks), schema.cns)
 
-def load_iodp_cns():
-    # Read in data and rename columns
-    iodp_data = pd.read_csv(dfp.iodp_carbon, sep=",", header=0,
-                            skiprows=None, encoding='windows-1252')
+def standardize_iodp_cns(iodp_data):
+    # Replace detection-limit flags and rename columns
     iodp_data = iodp_data.replace(to_replace=['nd', 'n.d.', 'ND', 'N.D.',
                                                           'bdl', 'BLD', 'bld', 'bd',
                                                           'BD', 'BDL', 'b.d.l.', 'B.D.L.'], value=0)
@@ -95,30 +110,20 @@ def load_iodp_cns():
             iodp_data[col] = iodp_data[col].str.strip()
     iodp_data = iodp_data.replace('', np.nan)
     iodp_data = iodp_data[iodp_data['leg'] != 'TEST(344)']
-    return iodp_data
+    return schema.enforce(iodp_data, schema.cns)
 
-def load_chikyu_cns():
+def load_chikyu_cns(registry):
     chikyu_data = pd.DataFrame()
-    ##### File group info #####
-    summary = pd.read_csv(dfp.chikyu_meta, sep=",", header=0, skiprows=None)
-    summary = summary.iloc[1:,:].reset_index(drop=True)
-    summary['leg'] = summary['EXPNAME']
-    for n, hole_id in enumerate(summary.HOLENAME):
-        summary.loc[n,'hole'] = hole_id[-1]
-        summary.loc[n,'site'] = hole_id[:-1]
 
     for filename in os.listdir(dfp.chikyu_carbon):
         if filename.endswith(".csv"):
-            file_path = os.path.join('data','chikyu','cns',filename)
+            file_path = os.path.join(dfp.chikyu_carbon, filename)
             data_add = pd.read_csv(file_path, sep=",", header=0, skiprows=None)
             # Find leg, site, hole
-            for col in data_add.select_dtypes([np.object]):
-                for n in np.arange(len(summary)):
-                    hole_ids = (summary['site'].map(str) + summary['hole'])
-                    if data_add[col].str.contains(hole_ids[n]).any():
-                        leg = summary.loc[n,'leg']
-                        site = summary.loc[n,'site']
-                        hole = summary.loc[n,'hole']
+            hole_id = registry.chikyu_resolver.resolve(data_add, file_path)
+            if hole_id is None:
+                continue
+            leg, site, hole = hole_id
             #Add in leg, site, hole, sample_depth
             leglist = [leg] * len(data_add)
             leglist = pd.Series(leglist, name='leg')
@@ -153,18 +158,15 @@ def load_chikyu_cns():
             continue
 
     chikyu_data = chikyu_data.reset_index(drop=True)
-    chikyu_data = chikyu_data.applymap(str)
-    return chikyu_data
-
-def compile_cns():
-    dsdp = load_dsdp_cns()
-    odp = load_odp_cns()
-    iodp = load_iodp_cns()
-    chikyu = load_chikyu_cns()
-
-    cns = pd.concat((dsdp, odp, iodp, chikyu), axis=0, sort=False).reset_index(drop=True)
-    cns = cns.applymap(str)
-    cns = cns.reset_index(drop=True)
+    return schema.enforce(chikyu_data, schema.cns)
+
+def compile_cns(registry, executor=None, manifest=None, report=None, memory_budget=None):
+    dsdp, odp, iodp, chikyu = run_loaders([(load_dsdp_cns, memory_budget),
+                                           (load_odp_cns, memory_budget),
+                                           (load_iodp_cns, memory_budget),
+                                           (load_chikyu_cns, registry)], executor, manifest, report)
+
+    cns = schema.concat((dsdp, odp, iodp, chikyu), schema.cns)
     return cns
 
 
@@ -16,11 +16,62 @@ import numpy as np
 import os
 
 from ocean_drilling_db import data_filepaths as dfp
-
-def load_dsdp_iw():
+from ocean_drilling_db import schema
+from ocean_drilling_db import streaming
+from ocean_drilling_db.pipeline import run_loaders
+
+def split_entries(data, value_cols, sep):
+    # Split cells with multiple entries into separate replicate rows, for all
+    # value columns at once. Returns sample_key, rep_key, then value_cols, with
+    # rep_key numbering the entries of each analyte within a sample from 1.
+    values = data[['sample_key'] + value_cols].melt(id_vars='sample_key', var_name='analyte')
+    values['analyte'] = pd.Categorical(values['analyte'], categories=value_cols)
+    values['value'] = values['value'].str.split(sep)
+    values = values.explode('value')
+    values['rep_key'] = values.groupby(['sample_key', 'analyte'], sort=False).cumcount()+1
+    values = values.set_index(['sample_key', 'rep_key', 'analyte'])['value']
+    data_std = values.unstack('analyte').reindex(columns=value_cols)
+    data_std.columns = list(data_std.columns)
+    return data_std.reset_index()
+
+# Analyte reported in each field of DSDP IW data cards, in output column order.
+# Fields not listed (e.g. field #5 of card 4) are not used.
+dsdp_card_analytes = pd.DataFrame(
+    [(1, 'data field #1', 'Ca'), (1, 'data field #2', 'Mg'),
+     (1, 'data field #3', 'Cl'), (1, 'data field #4', 'NH4'),
+     (1, 'data field #5', 'PO4'), (1, 'data field #6', 'Si'),
+     (1, 'reference', 'ref_1'),
+     (2, 'data field #1', 'Sr'), (2, 'data field #2', 'K'),
+     (2, 'data field #3', 'Mn'), (2, 'data field #4', 'SO4'),
+     (2, 'data field #5', 'Ba'), (2, 'data field #6', 'Zn'),
+     (2, 'reference', 'ref_2'),
+     (3, 'data field #1', 'P2O4'), (3, 'data field #2', 'Cu'),
+     (3, 'data field #3', 'Fe'), (3, 'data field #4', 'Li'),
+     (3, 'data field #5', 'Al'), (3, 'data field #6', 'Na'),
+     (3, 'reference', 'ref_3'),
+     (4, 'data field #1', 'Br'), (4, 'data field #2', 'B'),
+     (4, 'data field #3', 'Rb'), (4, 'data field #4', 'Ni'),
+     (4, 'data field #6', 'NO3'), (4, 'reference', 'ref_4'),
+     (5, 'reference', 'ref_5'),
+     (6, 'reference', 'ref_6')],
+    columns=['card number', 'field', 'analyte'])
+
+# Columns of the DSDP IW file that identify a sample
+dsdp_sample_columns = ['leg', 'site', 'hole', 'core', 'section',
+                       'top of sampled interval (cm)', 'bottom of sampled interval(cm)',
+                       'depth to core (m)', 'depth to sample (m)']
+
+def load_dsdp_iw(memory_budget=None):
     print('Loading DSDP IW...')
-    dsdp_data = pd.read_csv(dfp.dsdp_iw, sep="\t", header=0,
-                                skiprows=None, encoding='windows-1252')
+    # Read in data, in chunks of whole samples if there is a memory budget (MB)
+    chunks = streaming.read_csv(dfp.dsdp_iw, memory_budget, group_cols=dsdp_sample_columns,
+                                sep="\t", header=0, skiprows=None, encoding='windows-1252')
+    dsdp_std_final = streaming.collect(map(standardize_dsdp_iw, chunks), schema.iw_chem,
+                                       schema.iw_chem_default, key='sample_key')
+    print('DSDP IW loaded.')
+    return dsdp_std_final
+
+def standardize_dsdp_iw(dsdp_data):
     dsdp_data = dsdp_data.rename(columns={'depth to sample (m)':'sample_depth',
                                           'depth to core (m)':'core_depth',
                                           'bottom of sampled interval(cm)':'bottom',
@@ -28,13 +79,12 @@ def load_dsdp_iw():
 
     dsdp_data = dsdp_data[dsdp_data['card type'] == 'DATA CARD']
 
-    sample_keys = dsdp_data[['leg','site','hole','core','section',
-                           'bottom','top','core_depth','sample_depth']].drop_duplicates()
+    sample_cols = ['leg','site','hole','core','section',
+                   'bottom','top','core_depth','sample_depth']
+    sample_keys = dsdp_data[sample_cols].drop_duplicates()
     sample_keys = sample_keys.reset_index(drop=True).reset_index()
     sample_keys = sample_keys.rename(columns={'index':'sample_key'})
-    dsdp_data = pd.merge(dsdp_data, sample_keys, how='left',
-                         on=['leg','site','hole','core','section',
-                           'bottom','top','core_depth','sample_depth'])
+    dsdp_data = pd.merge(dsdp_data, sample_keys, how='left', on=sample_cols)
 
     anchor_df = dsdp_data[dsdp_data['card type'] == 'DATA CARD']
     anchor_df = dsdp_data[['sample_key','leg','site','hole','core','section',
@@ -46,44 +96,24 @@ def load_dsdp_iw():
     anchor_df['rep_key'] = anchor_df.groupby('sample_key').cumcount()+1
     anchor_df = anchor_df.dropna(how='all',subset=['pH','alkalinity','salinity']).reset_index(drop=True)
 
-    col_labels = [{'data field #1':'Ca','data field #2':'Mg',
-               'data field #3':'Cl','data field #4':'NH4','data field #5':'PO4',
-               'data field #6':'Si','reference':'ref_1'},
-               {'data field #1':'Sr','data field #2':'K',
-               'data field #3':'Mn','data field #4':'SO4','data field #5':'Ba',
-               'data field #6':'Zn','reference':'ref_2'},
-               {'data field #1':'P2O4','data field #2':'Cu',
-               'data field #3':'Fe','data field #4':'Li','data field #5':'Al',
-               'data field #6':'Na','reference':'ref_3'},
-               {'data field #1':'Br','data field #2':'B',
-               'data field #3':'Rb','data field #4':'Ni',
-               'data field #6':'NO3','reference':'ref_4'},
-               {'reference':'ref_5'},
-               {'reference':'ref_6'}]
-
-    cards = []
-    for n in np.arange(6)+1:
-        cards.append(dsdp_data[(dsdp_data['card number'] == n) & (dsdp_data['card type'] == 'DATA CARD')])
-
-    for n, card in enumerate(cards):
-        card = card[['sample_key','leg','site','hole','core','section', 'top',
-                     'bottom','core_depth','sample_depth','data field #1',
-                     'data field #2','data field #3','data field #4',
-                     'data field #5','data field #6','reference']]
-        card = card.rename(columns=col_labels[n])
-        if n == 3:
-            card = card.drop(columns=['data field #5'])
-        elif n == 4 or n == 5:
-            card = card.drop(columns=['data field #1','data field #2','data field #3',
-                       'data field #4','data field #5','data field #6'])
-        card['rep_key'] = card.groupby('sample_key').cumcount()+1
-        cards[n] = card
-
-    dsdp_std_final = anchor_df
-    for card in cards:
-        dsdp_std_final = pd.merge(dsdp_std_final, card, how='outer',
-                              on=['sample_key', 'rep_key', 'leg', 'site', 'hole', 'core',
-                                  'section', 'top', 'bottom', 'core_depth', 'sample_depth'])
+    # Pivot the data fields of all cards at once, replicates numbered per card
+    card_fields = list(dsdp_card_analytes['field'].unique())
+    cards = dsdp_data[['sample_key', 'card number'] + card_fields]
+    cards = cards.assign(rep_key=cards.groupby(['sample_key', 'card number']).cumcount()+1)
+    cards = cards.melt(id_vars=['sample_key', 'card number', 'rep_key'],
+                       var_name='field')
+    cards = cards.merge(dsdp_card_analytes, how='inner', on=['card number', 'field'])
+    cards['analyte'] = pd.Categorical(cards['analyte'],
+                                      categories=dsdp_card_analytes['analyte'])
+    cards = cards.set_index(['sample_key', 'rep_key', 'analyte'])['value'].unstack('analyte')
+    cards = cards.reindex(columns=dsdp_card_analytes['analyte']).reset_index()
+    cards.columns = list(cards.columns)
+
+    dsdp_std_final = anchor_df.drop(columns=sample_cols).merge(cards, how='outer',
+                                                                on=['sample_key', 'rep_key'])
+    dsdp_std_final = sample_keys.merge(dsdp_std_final, how='right', on='sample_key')
+    # Order by sample rather than by outer merge, the same for a file or its chunks
+    dsdp_std_final = dsdp_std_final.sort_values(['sample_key', 'rep_key'], kind='mergesort')
 
     # Make specific substitutions and formatting
     dsdp_std_final = dsdp_std_final.replace(to_replace=['.'], value=np.nan)
@@ -94,16 +124,29 @@ def load_dsdp_iw():
     dsdp_std_final[['Sr','Zn','Cu','B']] = dsdp_std_final[['Sr','Zn','Cu','B']].astype(float)*1000
     dsdp_std_final['Li'] = dsdp_std_final['Li'].astype(float)/10
 
-    dsdp_std_final = dsdp_std_final.applymap(str)
-    print('DSDP IW loaded.')
-    return dsdp_std_final
+    return schema.enforce(dsdp_std_final, schema.iw_chem, schema.iw_chem_default)
 
 
-def load_odp_iw():
+def load_odp_iw(memory_budget=None):
     print('Loading ODP IW...')
-    odp_data = pd.read_csv(dfp.odp_iw, sep="\t", header=0,
-                                    skiprows=None, encoding='windows-1252')
-    odp_data = odp_data.applymap(str)
+    # Read as text once, in chunks of whole samples (the first 9 columns) if
+    # there is a memory budget (MB). Cells with multiple entries are split below
+    chunks = streaming.read_csv(dfp.odp_iw, memory_budget, group_cols=list(range(9)),
+                                prepare=clean_odp_iw, sep="\t", header=0,
+                                skiprows=None, encoding='windows-1252', dtype=str)
+    odp_std_final = streaming.collect(map(standardize_odp_iw, chunks), schema.iw_chem,
+                                      schema.iw_chem_default, key='sample_key')
+    print('ODP IW loaded.')
+    return odp_std_final
+
+def clean_odp_iw(odp_data):
+    odp_data = odp_data.fillna('nan')
+    for col in odp_data.columns:
+        odp_data[col] = odp_data[col].str.strip() # remove leading and trailing whitespace
+    return odp_data
+
+def standardize_odp_iw(odp_data):
+    odp_data = clean_odp_iw(odp_data)
 
     odp_headers = ['leg', 'site', 'hole', 'core', 'type', 'section', 'top',
                    'bottom', 'sample_depth', 'Al', 'NH4', 'B', 'Br', 'Ca',
@@ -112,31 +155,22 @@ def load_odp_iw():
                    'Ba', 'Pb', 'H2', 'DIC', 'formate', 'ppH', 'DOC', 'acetate',
                    'NO2', 'color', 'sulfide', 'Zn']
     odp_data.columns = odp_headers
-    for col in odp_data.columns:
-        odp_data[col] = odp_data[col].str.strip() # remove leading and trailing whitespace
 
     # Create table of unique samples with sample keys
     odp_unique = odp_data[['leg', 'site', 'hole', 'core', 'type', 'section', 'top',
                            'bottom', 'sample_depth']]
     odp_unique = odp_unique.drop_duplicates().reset_index(drop=True).reset_index()
-    odp_unique = odp_unique.rename(columns = {"index": "sample_key"}).applymap(str)
+    odp_unique = odp_unique.rename(columns = {"index": "sample_key"})
 
     # Join with data table to get sample_key applied to all rows
     odp_data = odp_data.merge(odp_unique, how='left', on=['leg', 'site', 'hole',
                                                            'core', 'type', 'section',
                                                            'top', 'bottom', 'sample_depth'])
 
-    odp_data_std = pd.DataFrame(columns=['sample_key', 'rep_key'])
-    for col in odp_data.columns.drop(list(odp_unique.columns)):
-        all_data = odp_data[col].str.split('\s+').apply(pd.Series) # Split cells with multiple entries into separte rows
-        all_data.index = odp_data['sample_key'] # Assign sample_keys to index
-        all_data = all_data.stack().reset_index(0) # Stack columns into one column and pull out sample_keys along with each value
-        all_data.columns = ['sample_key', odp_data[col].name]
-        all_data['rep_key'] = all_data.groupby('sample_key').cumcount()+1
-        odp_data_std = odp_data_std.merge(all_data, how='outer', on=['sample_key', 'rep_key'])
+    odp_data_std = split_entries(odp_data, list(odp_data.columns.drop(list(odp_unique.columns))), r'\s+')
     odp_std_final = odp_data_std.merge(odp_unique, how='outer', on=['sample_key'])
     odp_std_final = odp_std_final.replace(to_replace='None', value=np.nan)
-    odp_std_final.rep_key = odp_std_final.rep_key.map(int).map(str)
+    odp_std_final.rep_key = odp_std_final.rep_key.map(int)
 
     odp_std_final = odp_std_final.replace(['','...'],np.nan)
     odp_std_final = odp_std_final.fillna(np.nan)
@@ -148,34 +182,39 @@ def load_odp_iw():
     odp_std_final['Pb'] = odp_std_final['Pb'].astype(float)*1000
     odp_std_final['NO2'] = odp_std_final['NO2'].astype(float)/1000
     odp_std_final['Zn'] = odp_std_final['Zn'].astype(float)*1000
-    print('ODP IW loaded.')
-    return odp_std_final
+    return schema.enforce(odp_std_final, schema.iw_chem, schema.iw_chem_default)
 
 
-def load_iodp_iw():
+def load_iodp_iw(memory_budget=None):
     print('Loading IODP IW...')
-    iodp_data = pd.read_csv(dfp.iodp_iw, sep=",", header=0,
-                                        skiprows=None,
-                                        encoding='windows-1252',
-                                        low_memory=False)
-    iodp_data = iodp_data.applymap(str)
+    # Read as text once, in chunks of whole samples (the first 13 columns) if
+    # there is a memory budget (MB). Cells with multiple entries are split below
+    chunks = streaming.read_csv(dfp.iodp_iw, memory_budget, group_cols=list(range(13)),
+                                prepare=clean_iodp_iw, sep=",", header=0,
+                                skiprows=None, encoding='windows-1252', dtype=str)
+    iodp_std_final = streaming.collect(map(standardize_iodp_iw, chunks), schema.iw_chem,
+                                       schema.iw_chem_default, key='sample_key')
+    print('IODP IW loaded.')
+    return iodp_std_final
+
+def clean_iodp_iw(iodp_data):
+    iodp_data = iodp_data.fillna('nan')
     for x in iodp_data.columns:
         iodp_data[x] = iodp_data[x].str.strip() # remove leading and trailing whitespace
-    iodp_data.shape
-
-    # Load data from file
-    # iodp_data_no_comm = iodp_data.iloc[:,:-5]
 
     # Make specific replacements
     iodp_data = iodp_data.replace(to_replace='320(321)', value='321')
     iodp_data = iodp_data.replace(to_replace=['nd', 'n.d.', 'ND', 'N.D.',
                                                               'bdl', 'BLD', 'bld', 'bd',
-                                                              'BD', 'BDL', 'b.d.l.', 'B.D.L.'], value=0)
-    iodp_data = iodp_data.replace(to_replace=['bld', 'bdl'], value=0, regex=True)
-    iodp_data = iodp_data.replace(to_replace=['<\S+', '-\d+\.\d+', '-\d+'], value=0, regex=True)
-    iodp_data = iodp_data.replace(to_replace=['-', 'invalid', 'Ã¢Â¿Â¿'], value=np.nan)
-    iodp_data = iodp_data.applymap(str)
-    #iodp_data = pd.concat([iodp_data, iodp_data_raw], axis=1)
+                                                              'BD', 'BDL', 'b.d.l.', 'B.D.L.'], value='0')
+    # Whole cell set to 0 if it has a detection-limit flag or negative value anywhere
+    iodp_data = iodp_data.replace(to_replace=r'(?s).*(?:bld|bdl|<\S|-\d).*', value='0', regex=True)
+    iodp_data = iodp_data.replace(to_replace=['-', 'invalid', 'Ã¢Â¿Â¿'], value='nan')
+    return iodp_data
+
+def standardize_iodp_iw(iodp_data):
+    # Row labels of a chunk continue from the previous chunk
+    iodp_data = clean_iodp_iw(iodp_data.reset_index(drop=True))
 
     # Create table of unique samples
     id_cols = list(iodp_data.columns[:13])
@@ -184,24 +223,14 @@ def load_iodp_iw():
     comment_cols = iodp_unique.reset_index()['index']
     iodp_unique = iodp_unique.reset_index(drop=True).reset_index()
     iodp_unique = iodp_unique.rename(columns = {"index": "sample_key"})
-    iodp_unique = iodp_unique.applymap(str)
 
     # Join with data table to get sample_key applied to all rows
     iodp_data = iodp_data.merge(iodp_unique, how='outer', on=id_cols)
-    iodp_data = iodp_data.applymap(str)
 
     # Add rep_key and split duplicates in single cells
     data_cols = list(iodp_data.columns[13:-6])
-    iodp_data_std = pd.DataFrame(columns=['sample_key', 'rep_key'], dtype='str')
-    for col_name in data_cols:
-       df_all = iodp_data[col_name].str.split('[,](?!\s)').apply(pd.Series) # Split cells with multiple entries into separte rows
-       df_all.index = iodp_data['sample_key'] # Assign sample_keys to index
-       df_all = df_all.stack().reset_index(0) # Stack columns into one column and pull out sample_keys along with each value
-       df_all.columns = ['sample_key', col_name]
-       df_all['rep_key'] = df_all.groupby(['sample_key']).cumcount()+1
-       df_all = df_all.reset_index(drop=True)
-       iodp_data_std = iodp_data_std.merge(df_all, how='outer', on=['sample_key', 'rep_key'])
-    iodp_analytes = iodp_data_std.applymap(float)
+    iodp_data_std = split_entries(iodp_data, data_cols, r'[,](?!\s)')
+    iodp_analytes = iodp_data_std.astype(float)
 
     # Make unit conversions to standard
     iodp_analytes['Al (uM) 309.3 nm ICPAES'] = iodp_analytes['Al (uM) 309.3 nm ICPAES'].astype(float)/1000
@@ -239,18 +268,12 @@ def load_iodp_iw():
     reduced_list = iodp_analytes.groupby(by=analyte_dict, axis=1).mean()
     reduced_list = reduced_list.iloc[:,1:]
     reduced_list = pd.concat([reduced_list, iodp_data_std.loc[:,['rep_key', 'sample_key']]], axis=1)
-    reduced_list.rep_key = reduced_list.rep_key.map(int).map(str)
+    reduced_list.rep_key = reduced_list.rep_key.map(int)
 
     # Calculate sample_depth
-    sample_depth = pd.Series(name='sample_depth')
-    for x in np.arange(len(iodp_unique)):
-        if iodp_unique["Top depth CSF-A (m)"][x] == np.nan:
-            sample_depth.at[x] = np.nan
-        elif iodp_unique["Bottom depth CSF-A (m)"][x] == np.nan:
-            sample_depth.at[x] = np.nan
-        else:
-            sample_d = np.average([iodp_unique["Top depth CSF-A (m)"].astype(float)[x], iodp_unique["Bottom depth CSF-A (m)"].astype(float)[x]])
-            sample_depth.at[x] = sample_d
+    sample_depth = (iodp_unique["Top depth CSF-A (m)"].astype(float) +
+                    iodp_unique["Bottom depth CSF-A (m)"].astype(float))/2
+    sample_depth.name = 'sample_depth'
 
     # Standardize sample labels
     std_labels = ['leg', 'site', 'hole', 'core', 'type', 'section', 'aw', 'top', 'bottom']
@@ -260,7 +283,8 @@ def load_iodp_iw():
 
     # Join sample labels, analyte data, and comments
     iodp_final = label_data.merge(reduced_list, how='inner', on='sample_key')
-    iodp_final = pd.merge(iodp_final, iodp_data.loc[comment_cols,['sample_key', 'Proceedings label', 'Comments']], how='outer', on='sample_key')
+    comments = iodp_data.loc[comment_cols,['sample_key', 'Proceedings label', 'Comments']].drop_duplicates()
+    iodp_final = pd.merge(iodp_final, comments, how='outer', on='sample_key')
 
     # Create final iodp iw dataset
     iodp_std_final = iodp_final[['sample_key', 'rep_key', 'leg', 'site', 'hole',
@@ -273,11 +297,10 @@ def load_iodp_iw():
                                  'SO4', 'sulfide', 'U', 'V', 'Proceedings label',
                                  'Comments']]
     iodp_std_final = iodp_std_final.rename(columns={'Proceedings label': 'proceedings_label'})
-    print('IODP IW loaded.')
-    return iodp_std_final
+    return schema.enforce(iodp_std_final, schema.iw_chem, schema.iw_chem_default)
 
 
-def load_chikyu_iw(hole_metadata):
+def load_chikyu_iw(registry):
     print('Loading Chikyu IW...')
     ##### File group info #####
     # use filenames that include 'bulk-pore-water-chemistry'
@@ -285,23 +308,14 @@ def load_chikyu_iw(hole_metadata):
     counter = 0
     for filename in os.listdir(dfp.chikyu_iw):
         if filename.endswith(".csv"):
-            file_path = os.path.join('data','chikyu','iw',filename)
+            file_path = os.path.join(dfp.chikyu_iw, filename)
             data_add = pd.read_csv(file_path, sep=",", header=0, skiprows=None)
-            counter += 1
             # Find leg, site, hole
-            leg = 'no_leg'
-            # print(counter)
-            for col in data_add.select_dtypes(include='object'):
-                for n in np.arange(len(hole_metadata)):
-                    hole_ids = (hole_metadata['site'].map(str) + hole_metadata['hole'])
-                    if data_add[col].str.contains(hole_ids[n]).any() and 'C0' in hole_ids[n]:
-                        leg = str(hole_metadata.loc[n,'leg'])
-                        site = hole_metadata.loc[n,'site']
-                        hole = hole_metadata.loc[n,'hole']
-                        break
-
-                if leg != 'no_leg':
-                    break
+            hole_id = registry.chikyu_resolver.resolve(data_add, file_path)
+            if hole_id is None:
+                continue
+            leg, site, hole = hole_id
+            counter += 1
             #Add in leg, site, hole, sample_depth
             leglist = [leg] * len(data_add)
             leglist = pd.Series(leglist, name='leg', dtype='str')
@@ -451,20 +465,30 @@ def load_chikyu_iw(hole_metadata):
 
     # Join sample labels, analyte data, and comments
     chikyu_std_final = pd.concat([chikyu_idents, analytes_reduced], axis=1)
+    chikyu_std_final = schema.enforce(chikyu_std_final, schema.iw_chem, schema.iw_chem_default)
 
     print('Chikyu IW loaded.')
     return chikyu_std_final
 
 
-def compile_iw(site_metadata):
-    dsdp_iw = load_dsdp_iw()
-    odp_iw = load_odp_iw()
-    iodp_iw = load_iodp_iw()
-    chikyu_iw = load_chikyu_iw(site_metadata)
-
-    iw = pd.concat((dsdp_iw, odp_iw, iodp_iw, chikyu_iw), axis=0, sort=False).reset_index(drop=True)
-    iw = iw[(~iw['leg'].str.contains('QAQC')) & (~iw['leg'].str.contains('TEST'))]
-    iw = iw.applymap(str)
+def compile_iw(registry, executor=None, manifest=None, report=None, memory_budget=None):
+    dsdp_iw, odp_iw, iodp_iw, chikyu_iw = run_loaders([(load_dsdp_iw, memory_budget),
+                                                       (load_odp_iw, memory_budget),
+                                                       (load_iodp_iw, memory_budget),
+                                                       (load_chikyu_iw, registry)],
+                                                      executor, manifest, report)
+
+    # Offset sample keys of each source so (sample_key, rep_key) is unique overall
+    sources = []
+    offset = 0
+    for data in (dsdp_iw, odp_iw, iodp_iw, chikyu_iw):
+        sources.append(data.assign(sample_key=data['sample_key'] + offset))
+        if len(data):
+            offset += int(data['sample_key'].max()) + 1
+
+    iw = schema.concat(sources, schema.iw_chem, schema.iw_chem_default)
+    iw = iw[(~iw['leg'].str.contains('QAQC', na=False)) & (~iw['leg'].str.contains('TEST', na=False))]
+    iw = schema.enforce(iw, schema.iw_chem, schema.iw_chem_default)
     iw = iw.reset_index(drop=True)
     return iw
 
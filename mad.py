@@ -16,11 +16,18 @@ import pandas as pd
 import numpy as np
 
 from ocean_drilling_db import data_filepaths as dfp
+from ocean_drilling_db import schema
+from ocean_drilling_db import streaming
+from ocean_drilling_db.pipeline import run_loaders
 
-def load_dsdp_mad():
-    # Read in data and rename columns
-    dsdp_data = pd.read_csv(dfp.dsdp_mad, sep="\t", header=0,
-                            skiprows=None, encoding='windows-1252')
+def load_dsdp_mad(memory_budget=None):
+    # Read in data, in chunks if there is a memory budget (MB)
+    chunks = streaming.read_csv(dfp.dsdp_mad, memory_budget, sep="\t", header=0,
+                                skiprows=None, encoding='windows-1252')
+    return streaming.collect(map(standardize_dsdp_mad, chunks), schema.mad)
+
+def standardize_dsdp_mad(dsdp_data):
+    # Rename columns
     dsdp_data = dsdp_data.rename(columns={'sample depth (m)':'sample_depth',
                               'grain density (g/cc)':'grain_density'})
     dsdp_data = dsdp_data[['leg','site','hole','core','section','sample_depth',
@@ -30,13 +37,17 @@ def load_dsdp_mad():
             dsdp_data[col] = dsdp_data[col].str.strip()
     dsdp_data = dsdp_data.replace('', np.nan)
     dsdp_data['porosity'] = dsdp_data['porosity']/100
-    return dsdp_data
+    return schema.enforce(dsdp_data, schema.mad)
+
 
+def load_odp_mad(memory_budget=None):
+    # Read in data, in chunks if there is a memory budget (MB)
+    chunks = streaming.read_csv(dfp.odp_mad, memory_budget, sep="\t", header=0,
+                                skiprows=None, encoding='windows-1252', low_memory=False)
+    return streaming.collect(map(standardize_odp_mad, chunks), schema.mad)
 
-def load_odp_mad():
-    # Read in data and rename columns
-    odp_data = pd.read_csv(dfp.odp_mad, sep="\t", header=0,
-                            skiprows=None, encoding='windows-1252', low_memory=False)
+def standardize_odp_mad(odp_data):
+    # Rename columns
     odp_data = odp_data.rename(columns={'Leg':'leg', 'Site':'site', 'H':'hole',
                                         'Cor':'core','Sc':'section',
                                         'Depth (mbsf)':'sample_depth',
@@ -49,12 +60,16 @@ def load_odp_mad():
             odp_data[col] = odp_data[col].str.strip()
     odp_data = odp_data.replace('', np.nan)
     odp_data['porosity'] = odp_data['porosity'].astype(float)/100
-    return odp_data
+    return schema.enforce(odp_data, schema.mad)
+
+def load_iodp_mad(memory_budget=None):
+    # Read in data, in chunks if there is a memory budget (MB)
+    chunks = streaming.read_csv(dfp.iodp_mad, memory_budget, sep=",", header=0,
+                                skiprows=None, encoding='windows-1252')
+    return streaming.collect(map(standardize_iodp_mad, chunks), schema.mad)
 
-def load_iodp_mad():
-    # Read in data and rename columns
-    iodp_data = pd.read_csv(dfp.iodp_mad, sep=",", header=0,
-                            skiprows=None, encoding='windows-1252')
+def standardize_iodp_mad(iodp_data):
+    # Replace combined expedition labels and rename columns
     iodp_data = iodp_data.replace(to_replace='320(321)', value='321')
     iodp_data = iodp_data.rename(columns={'Exp':'leg', 'Site':'site',
                                           'Hole':'hole', 'Core':'core',
@@ -72,30 +87,20 @@ def load_iodp_mad():
     iodp_data['leg'] = iodp_data['leg'].replace('345(147)', '345')
     iodp_data['leg'] = iodp_data['leg'].replace('327(301)', '327')
     iodp_data['leg'] = iodp_data['leg'].replace('335(312)', '335')
-    return iodp_data
+    return schema.enforce(iodp_data, schema.mad)
 
-def load_chikyu_mad():
+def load_chikyu_mad(registry):
     chikyu_data = pd.DataFrame()
-    ##### File group info #####
-    summary = pd.read_csv(dfp.chikyu_meta, sep=",", header=0, skiprows=None)
-    summary = summary.iloc[1:,:].reset_index(drop=True)
-    summary['leg'] = summary['EXPNAME']
-    for n, hole_id in enumerate(summary.HOLENAME):
-        summary.loc[n,'hole'] = hole_id[-1]
-        summary.loc[n,'site'] = hole_id[:-1]
 
     for filename in os.listdir(dfp.chikyu_mad):
         if filename.endswith(".csv"):
-            file_path = os.path.join('data','chikyu','mad',filename)
+            file_path = os.path.join(dfp.chikyu_mad, filename)
             data_add = pd.read_csv(file_path, sep=",", header=0, skiprows=None)
             # Find leg, site, hole
-            for col in data_add.select_dtypes([np.object]):
-                for n in np.arange(len(summary)):
-                    hole_ids = (summary['site'].map(str) + summary['hole'])
-                    if data_add[col].str.contains(hole_ids[n]).any():
-                        leg = summary.loc[n,'leg']
-                        site = summary.loc[n,'site']
-                        hole = summary.loc[n,'hole']
+            hole_id = registry.chikyu_resolver.resolve(data_add, file_path)
+            if hole_id is None:
+                continue
+            leg, site, hole = hole_id
             #Add in leg, site, hole, sample_depth
             leglist = [leg] * len(data_add)
             leglist = pd.Series(leglist, name='leg')
@@ -117,17 +122,15 @@ def load_chikyu_mad():
         else:
             continue
     chikyu_data = chikyu_data.reset_index(drop=True)
-    return chikyu_data
+    return schema.enforce(chikyu_data, schema.mad)
 
-def compile_mad():
-    dsdp = load_dsdp_mad()
-    odp = load_odp_mad()
-    iodp = load_iodp_mad()
-    chikyu = load_chikyu_mad()
+def compile_mad(registry, executor=None, manifest=None, report=None, memory_budget=None):
+    dsdp, odp, iodp, chikyu = run_loaders([(load_dsdp_mad, memory_budget),
+                                           (load_odp_mad, memory_budget),
+                                           (load_iodp_mad, memory_budget),
+                                           (load_chikyu_mad, registry)], executor, manifest, report)
 
-    mad = pd.concat((dsdp, odp, iodp, chikyu), axis=0, sort=False).reset_index(drop=True)
-    mad = mad.applymap(str)
-    mad = mad.reset_index(drop=True)
+    mad = schema.concat((dsdp, odp, iodp, chikyu), schema.mad)
     return mad
 
 
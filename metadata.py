@@ -7,11 +7,14 @@ Created on Tue Feb 21 19:32:29 2017
 Script for integrating hole summaries into format for database (summary_all)
 
 """
+import os
 import pandas as pd
 import numpy as np
 import re
 
 from ocean_drilling_db import data_filepaths as dfp
+from ocean_drilling_db import schema
+from ocean_drilling_db.coordinates import parse_columns
 
 def compile_metadata():
 
@@ -57,49 +60,20 @@ def compile_metadata():
     chikyu_db = chikyu.loc[:,chikyu_cols]
     chikyu_db = chikyu_db.rename(columns=chikyu_dict)
 
-    # Assign Site and Hole to Chikyu data
+    # Assign Site and Hole to Chikyu data (hole is the last character of HOLENAME)
     chikyu_db = chikyu_db.iloc[1:,:].reset_index(drop=True)
-    for n, hole_id in enumerate(chikyu_db.site):
-        chikyu_db.loc[n,'hole'] = hole_id[-1]
-        chikyu_db.loc[n,'site'] = hole_id[:-1]
-
-    # Transform coordinates to decimal degrees for ODP and IODP data
-    def strip_coords(ser, bad_chars):
-        for char in bad_chars:
-            ser = ser.str.replace(char, '')
-        return ser
-
-    def coord_clean(ser):
-        ser = ser.str.strip()
-        degs = ser.str.extract(r'([^\s]+)').astype(float)
-        decs = ser.str.extract(r'(\s.*)').astype(float)
-        decs = decs/60
-        dec_deg = degs + decs
-        return dec_deg
-
-    def coord_transform(coord_series, bad_chars):
-        const = []
-        for x, coord in enumerate(coord_series):
-            if 'S' in coord:
-                const.append(-1)
-            elif 'W' in coord:
-                const.append(-1)
-            else:
-                const.append(1)
-
-        coords_stripped = strip_coords(coord_series, bad_chars)
-        coords = coord_clean(coords_stripped)
-        coords = coords.multiply(pd.Series(const), axis=0)
-        return coords
-
-
-    bad_chars = ['°',"'",'N','S','E','W']
-
-    odp_db['lat'] = coord_transform(odp_db['lat'], bad_chars)
-    odp_db['lon'] = coord_transform(odp_db['lon'], bad_chars)
-
-    iodp_db['lat'] = coord_transform(iodp_db['lat'], bad_chars)
-    iodp_db['lon'] = coord_transform(iodp_db['lon'], bad_chars)
+    chikyu_db['hole'] = chikyu_db['site'].str[-1]
+    chikyu_db['site'] = chikyu_db['site'].str[:-1]
+
+    # Transform coordinates to decimal degrees, listing any that cannot be used
+    dsdp_db, dsdp_report = parse_columns(dsdp_db, 'dsdp')
+    odp_db, odp_report = parse_columns(odp_db, 'odp')
+    iodp_db, iodp_report = parse_columns(iodp_db, 'iodp')
+    chikyu_db, chikyu_report = parse_columns(chikyu_db, 'chikyu')
+    coordinate_report = pd.concat([dsdp_report, odp_report, iodp_report, chikyu_report])
+    if len(coordinate_report) > 0:
+        print('{} hole coordinates missing or invalid, see {}.'.format(len(coordinate_report),
+                                                                         dfp.coordinate_report))
 
     # Combine all data
     hole_metadata = pd.concat([dsdp_db, odp_db, iodp_db, chikyu_db], axis=0)
@@ -128,6 +102,7 @@ def compile_metadata():
     site_keys = hole_metadata['site'].drop_duplicates().reset_index(drop=True).reset_index().rename(columns={'index':'site_key'})
     hole_metadata = hole_metadata.merge(site_keys, how='left', on = ['site'])
     hole_metadata = hole_metadata.loc[:,['hole_key', 'site_key', 'leg', 'site', 'hole', 'lat', 'lon', 'water_depth', 'total_penetration']].reset_index(drop=True)
+    hole_metadata = schema.enforce(hole_metadata, schema.hole_metadata)
 
     # Make site_metadata table
     # site_metadata = hole_metadata[['site_key', 'leg', 'site', 'advection_rate', 'bottom_water_temp', 'temp_gradient']].copy()
@@ -135,6 +110,8 @@ def compile_metadata():
 
     # Save csvs and send to database
     hole_metadata.to_csv("hole_metadata.csv", sep='\t')
+    os.makedirs(os.path.dirname(dfp.coordinate_report), exist_ok=True)
+    coordinate_report.to_csv(dfp.coordinate_report, index=False)
     # site_metadata.to_csv("site_metadata.csv", sep='\t')
 
     return hole_metadata
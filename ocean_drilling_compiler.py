@@ -21,46 +21,260 @@ holes are not included. Age-depth not available for Chikyu.
 
 Output:
     csv files for each dataset
-    option to export data into a MySQL database
+    JSON report of the time and memory used by each stage
+    Parquet and Arrow IPC files for each dataset
+    option of a unified pore water, MAD, and CNS sample table (Parquet and Arrow)
+    option of memory-mapped per-hole caches of pore water, MAD, and CNS
+    option to export data into a MySQL or single-file SQLite database
 
 """
 
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import metadata
 import age_depth
 import iw_chem
 import mad
 import cns
+from ocean_drilling_db import data_filepaths as dfp
+from ocean_drilling_db.instrument import Report, run_stage
+from ocean_drilling_db.manifest import Manifest
+from ocean_drilling_db.registry import MetadataRegistry
 
-# Option to create a local MySQL database of the data
+# Option to create a local MySQL or SQLite database of the data (backend set
+# in ocean_drilling_db/user_specs.py)
 # Set create_db variable to either True or False
 create_db = True
 
+# Option to load the database tables from staging files with the database's
+# bulk loader (LOAD DATA LOCAL INFILE on MySQL) instead of row INSERTs
+# Set bulk_load variable to either True or False
+bulk_load = True
+
+# Option to store leg, site, hole, core, section, type, method, and data_source
+# of every dataset as categoricals with one global dictionary, so every value has
+# the same integer code in all datasets and joins on these columns compare codes
+# Set shared_dictionaries variable to either True or False
+shared_dictionaries = True
+
+# Option to cache pore water, MAD, and CNS as memory-mapped column arrays indexed
+# by hole, for tools that read single holes (see ocean_drilling_db/hole_cache.py).
+# A cache is rewritten only when its dataset changed.
+# Set cache_holes variable to either True or False
+cache_holes = False
+
+# Option to add the age (yr) and sedimentation rate (cm/kyr) of every pore water,
+# MAD, and CNS sample, interpolated from the age-depth control points of its site
+# Set date_samples variable to either True or False
+date_samples = False
+
+# Option to fit an exponential porosity-depth profile to every hole with MAD data
+# and write the parameters (phi0, phi_inf, decay_length) to a csv file
+# Set fit_porosity variable to either True or False
+fit_porosity = False
+
+# Option to resample pore water and MAD profiles of every site onto a regular depth
+# grid, written as memory-mapped site x depth x analyte arrays with a mask
+# Set resample variable to either True or False, resample_grid to the
+# (top, bottom, step) of the grid in m
+resample = False
+resample_grid = (0, 1000, 1)
+
+# Option to estimate diffusive SO4, NH4, Ca, and Mg fluxes across the seafloor of
+# every hole from near-seafloor pore water gradients and MAD porosity
+# Set compute_fluxes variable to either True or False
+compute_fluxes = False
+
+# Option to join every pore water sample with the MAD and CNS measurements of its
+# hole nearest in depth (within unify_tolerance m) and write the unified table as
+# Parquet and Arrow files next to the datasets
+# Set unify_samples variable to either True or False (requires pyarrow),
+# unify_tolerance to the maximum depth difference in m
+unify_samples = False
+unify_tolerance = 0.5
+
+# Option to write every dataset as Parquet and memory-mappable Arrow files
+# Set export_columnar variable to either True or False (requires pyarrow)
+export_columnar = True
+
+# Option to rebuild incrementally, rerunning only the loaders whose input files
+# (or code) changed since the last run and reusing cached outputs for the rest
+# Set incremental variable to either True or False
+incremental = True
+
+# Option to run the independent DSDP, ODP, IODP, and Chikyu loaders of every
+# dataset at the same time on a process pool. Output is identical to a serial run.
+# Set parallel variable to either True or False, n_workers to the number of cores
+parallel = True
+n_workers = os.cpu_count()
+
+# Option to read the large DSDP, ODP, and IODP pore water, MAD, and CNS files in
+# chunks, so each loader uses about memory_budget (MB) plus the size of its typed
+# output instead of several times the size of its input file
+# Set streaming variable to either True or False, memory_budget to the MB per loader
+# (per worker process when parallel)
+streaming = False
+memory_budget = 512
+
+# Option to record wall time, CPU time, peak memory, and output size of every
+# compile stage and loader in a JSON report, and optionally a cProfile trace of each
+# Set instrument and profile_stages variables to either True or False
+instrument = True
+profile_stages = False
+
+
+if __name__ == '__main__':
+    if instrument == True:
+        report = Report(dfp.stage_profiles if profile_stages == True else None)
+    else:
+        report = None
+
+    print('Metadata loading...')
+    hole_metadata = run_stage(report, metadata.compile_metadata)
+    registry = MetadataRegistry(hole_metadata)
+    print('Metadata loaded.')
+
+    if incremental == True:
+        manifest = Manifest(dfp.manifest, dfp.loader_cache)
+    else:
+        manifest = None
+
+    if streaming == True:
+        budget = memory_budget
+    else:
+        budget = None
+
+    if parallel == True:
+        # Each dataset is compiled in its own thread, which hands its loaders
+        # to the shared process pool and concatenates the results in order
+        print('Age-depth, pore water, MAD, and CNS loading in parallel...')
+        with ProcessPoolExecutor(max_workers=n_workers) as executor, \
+             ThreadPoolExecutor(max_workers=4) as stages:
+            age_depth_stage = stages.submit(run_stage, report, age_depth.compile_age_depth,
+                                            registry, executor, manifest, report)
+            iw_stage = stages.submit(run_stage, report, iw_chem.compile_iw,
+                                     registry, executor, manifest, report, budget)
+            mad_stage = stages.submit(run_stage, report, mad.compile_mad,
+                                      registry, executor, manifest, report, budget)
+            cns_stage = stages.submit(run_stage, report, cns.compile_cns,
+                                      registry, executor, manifest, report, budget)
+
+            age_depth = age_depth_stage.result()
+            print('Age-depth loaded.')
+            interstitial_water_chem = iw_stage.result()
+            print('Pore water loaded.')
+            mad = mad_stage.result()
+            print('MAD loaded.')
+            cns = cns_stage.result()
+            print('CNS loaded.')
+    else:
+        print('Age-depth loading...')
+        age_depth = run_stage(report, age_depth.compile_age_depth, registry, None, manifest, report)
+        print('Age-depth loaded.')
+
+        print('Pore water loading...')
+        interstitial_water_chem = run_stage(report, iw_chem.compile_iw, registry, None, manifest, report, budget)
+        print('Pore water loaded.')
+
+        print('MAD loading...')
+        mad = run_stage(report, mad.compile_mad, registry, None, manifest, report, budget)
+        print('MAD loaded.')
+
+        print('CNS loading...')
+        cns = run_stage(report, cns.compile_cns, registry, None, manifest, report, budget)
+        print('CNS loaded.')
+
+    if shared_dictionaries == True:
+        from ocean_drilling_db.dictionaries import SharedDictionaries
+        print('Encoding identifiers with shared dictionaries...')
+        datasets = (hole_metadata, age_depth, interstitial_water_chem, mad, cns)
+        dictionaries = run_stage(report, SharedDictionaries, hole_metadata, datasets)
+        hole_metadata, age_depth, interstitial_water_chem, mad, cns = [dictionaries.encode(data)
+                                                                       for data in datasets]
+        # Hole and site keys of the encoded datasets are looked up by code
+        registry = MetadataRegistry(hole_metadata)
+        print('Identifiers encoded.')
+
+    if cache_holes == True:
+        from ocean_drilling_db import hole_cache
+        print('Writing hole caches...')
+        run_stage(report, hole_cache.write_hole_caches, {'iw_chem': interstitial_water_chem,
+                                                         'mad': mad,
+                                                         'cns': cns}, registry, dfp.hole_cache)
+        print('Hole caches written.')
+
+    if fit_porosity == True:
+        from ocean_drilling_db import porosity
+        print('Fitting porosity profiles...')
+        # The pool is opened inside the stage, so its workers' CPU time is measured
+        run_stage(report, porosity.write_porosity_fits, mad, registry, dfp.porosity_fits,
+                  None, n_workers if parallel == True else None)
+        print('Porosity profiles fitted.')
 
+    if resample == True:
+        import numpy as np
+        from ocean_drilling_db import resample as resampling
+        print('Resampling profiles...')
+        grid = np.arange(*resample_grid)
+        run_stage(report, resampling.write_cube, interstitial_water_chem, grid, dfp.resampled_output,
+                  'iw_chem', None, registry)
+        run_stage(report, resampling.write_cube, mad, grid, dfp.resampled_output, 'mad', None, registry)
+        print('Profiles resampled.')
 
-print('Metadata loading...')
-hole_metadata = metadata.compile_metadata()
-print('Metadata loaded.')
+    if compute_fluxes == True:
+        from ocean_drilling_db import flux
+        print('Computing diffusive fluxes...')
+        fluxes = run_stage(report, flux.diffusive_fluxes, interstitial_water_chem, mad, registry)
+        os.makedirs(os.path.dirname(dfp.diffusive_fluxes), exist_ok=True)
+        fluxes.to_csv(dfp.diffusive_fluxes, index=False)
+        print('Diffusive fluxes computed.')
 
-print('Age-depth loading...')
-age_depth = age_depth.compile_age_depth()
-print('Age-depth loaded.')
+    if date_samples == True:
+        from ocean_drilling_db.age_model import AgeModels, assign_ages
+        print('Assigning sample ages...')
+        age_models = run_stage(report, AgeModels, age_depth)
+        interstitial_water_chem = run_stage(report, assign_ages, age_models, interstitial_water_chem, registry)
+        mad = run_stage(report, assign_ages, age_models, mad, registry)
+        cns = run_stage(report, assign_ages, age_models, cns, registry)
+        print('Sample ages assigned.')
 
-print('Pore water loading...')
-interstitial_water_chem = iw_chem.compile_iw(hole_metadata)
-print('Pore water loaded.')
+    if unify_samples == True:
+        from ocean_drilling_db import unified
+        print('Joining pore water, MAD, and CNS samples...')
+        run_stage(report, unified.write_unified_samples, interstitial_water_chem, mad, cns,
+                  registry, dfp.columnar_output, unify_tolerance)
+        print('Unified sample table written.')
 
-print('MAD loading...')
-mad = mad.compile_mad()
-print('MAD loaded.')
+    if export_columnar == True:
+        from ocean_drilling_db import export
+        print('Writing Parquet and Arrow files...')
+        run_stage(report, export.export_datasets, {'hole_metadata': hole_metadata,
+                                                   'age_depth': age_depth,
+                                                   'iw_chem': interstitial_water_chem,
+                                                   'mad': mad,
+                                                   'cns': cns}, dfp.columnar_output)
+        print('Parquet and Arrow files written.')
 
-print('CNS loading...')
-cns = cns.compile_cns()
-print('CNS loaded.')
+    if create_db == True:
+        from ocean_drilling_db import create_database
+        from ocean_drilling_db import user_specs
+        datasets = (hole_metadata, age_depth, interstitial_water_chem, mad, cns)
+        if user_specs.backend == 'sqlite':
+            print('Loading SQLite database...')
+            run_stage(report, create_database.create_sqlite_db, dfp.sqlite_db, *datasets, bulk_load)
+            print('Compilation complete, SQLite database and csv files ready.')
+        else:
+            print('Loading MySQL database...')
+            run_stage(report, create_database.create_db, user_specs.username, user_specs.password,
+                      user_specs.host, user_specs.db_name, *datasets, bulk_load)
+            print('Compilation complete, MySQL database and csv files ready.')
+    else:
+        print('Compilation complete, csv files ready.')
 
-if create_db == True:
-    print('Compilation complete, MySQL database and csv files ready.')
-else:
-    print('Compilation complete, csv files ready.')
+    if report is not None:
+        report.save(dfp.stage_report)
+        print('Stage report written to {}.'.format(dfp.stage_report))
 
 
 
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 21:30:06 2026
+
+Piecewise-linear age models of every site, built from the compiled age-depth
+control points, and ages and sedimentation rates of samples at any depth.
+
+The control points of each site are sorted by depth, points at the same depth
+are averaged, and ages are made non-decreasing with depth (a running maximum),
+with the seafloor (0 m, 0 yr) added to sites without a control point there. All
+models are held in concatenated arrays. Samples of all sites are looked up in
+one searchsorted call on a composite key: depth shifted by a per-site offset
+larger than any depth, so each site occupies its own key range.
+
+Ages are in years (as in age_depth), sedimentation rates in cm/kyr. Depths
+below the deepest control point of a site get no age unless extrapolate is
+set, in which case the rate of the deepest interval is continued.
+
+"""
+import numpy as np
+import pandas as pd
+
+
+class AgeModels:
+    def __init__(self, age_depth, seafloor=True):
+        points = age_depth[['site_key', 'depth', 'age']].dropna()
+        points = points.astype({'site_key': 'int64', 'depth': float, 'age': float})
+        if seafloor == True:
+            sites = np.setdiff1d(points['site_key'].unique(),
+                                 points.loc[points['depth'] <= 0, 'site_key'].unique())
+            points = pd.concat([points, pd.DataFrame({'site_key': sites, 'depth': 0.0, 'age': 0.0})])
+        points = points.groupby(['site_key', 'depth'], as_index=False)['age'].mean()
+        points['age'] = points.groupby('site_key')['age'].cummax()
+
+        self.site_key = points['site_key'].to_numpy()
+        self.depth = points['depth'].to_numpy()
+        self.age = points['age'].to_numpy()
+
+        # Site of every model point, and its first and last point
+        self.sites, self.first, counts = np.unique(self.site_key, return_index=True,
+                                                   return_counts=True)
+        self.last = self.first + counts - 1
+        # Larger than the depth range, so the keys of consecutive sites never overlap
+        self.offset = 2 * np.abs(self.depth).max() + 1 if len(self.depth) else 1.0
+        self.key = self.composite_key(np.searchsorted(self.sites, self.site_key), self.depth)
+
+        # Sedimentation rate (cm/kyr) of the interval ending at each point
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = np.diff(self.depth) / np.diff(self.age) * 1e5
+        rate[~np.isfinite(rate)] = np.nan
+        self.rate = np.r_[np.nan, rate]
+        self.rate[self.first] = np.nan
+
+    def composite_key(self, site_index, depth):
+        return site_index * self.offset + depth
+
+    def evaluate(self, site_key, depth, extrapolate=False):
+        # Age (yr) and sedimentation rate (cm/kyr) at each (site_key, depth)
+        site_key = np.asarray(site_key, dtype=float)
+        depth = np.asarray(depth, dtype=float)
+        age = np.full(len(depth), np.nan)
+        rate = np.full(len(depth), np.nan)
+
+        if len(self.sites) == 0:
+            return age, rate
+        site_index = np.minimum(np.searchsorted(self.sites, site_key), len(self.sites) - 1)
+        known = (self.sites[site_index] == site_key) & np.isfinite(depth)
+        known &= self.last[site_index] > self.first[site_index]
+
+        n = site_index[known]
+        z = depth[known]
+        top = self.depth[self.first[n]]
+        bottom = self.depth[self.last[n]]
+        # End of the model interval holding each depth, kept within the site
+        end = np.searchsorted(self.key, self.composite_key(n, np.clip(z, top, bottom)), side='right')
+        end = np.clip(end, self.first[n] + 1, self.last[n])
+        start = end - 1
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fraction = (z - self.depth[start]) / (self.depth[end] - self.depth[start])
+        values = self.age[start] + fraction * (self.age[end] - self.age[start])
+        rates = self.rate[end]
+        outside = (z < top) | ((z > bottom) & (extrapolate == False))
+        values[outside] = np.nan
+        rates[outside] = np.nan
+
+        age[known] = values
+        rate[known] = rates
+        return age, rate
+
+
+def assign_ages(models, data, registry=None, depth_col='sample_depth', extrapolate=False):
+    # Add age and sed_rate columns to every sample of a depth-resolved dataset
+    if 'site_key' in data.columns:
+        site_keys = data['site_key']
+    else:
+        site_keys = registry.assign_hole_keys(data)['site_key']
+    age, rate = models.evaluate(site_keys.to_numpy(dtype=float, na_value=np.nan),
+                                data[depth_col].to_numpy(dtype=float, na_value=np.nan),
+                                extrapolate)
+    return data.assign(age=age, sed_rate=rate)
+
+# eof
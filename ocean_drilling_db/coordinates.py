@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 16:31:07 2026
+
+Parsing of hole coordinates to signed decimal degrees, shared by every
+program's hole summary.
+
+Coordinates are numbers (decimal degrees) or text of degrees, optional
+decimal minutes, and an optional hemisphere, e.g. "44 53.0307 S",
+"34° 22.0'N", or "-12.5". A whole column is parsed at once with one compiled
+regex (Series.str.extract), and S and W hemispheres are negative.
+
+Minutes of exactly 60 (a rounding artifact, e.g. "154° 60.0'W" for 155°W) carry
+into the degrees. Missing values, text that does not match, minutes above 60,
+hemispheres of the other axis, and latitudes beyond 90 or longitudes beyond
+180 degrees become NaN, and are listed with their hole and problem in a
+validation report.
+
+"""
+import re
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+coordinate_re = re.compile(r"""^\s*(?P<degrees>[-+]?\d+(?:\.\d*)?)\s*[°º]?\s*"""
+                           r"""(?:(?P<minutes>\d+(?:\.\d*)?)\s*'?)?\s*(?P<hemisphere>[NSEW])?\s*$""")
+
+# Largest absolute value and valid hemispheres of each axis
+limits = {'lat': (90, ['N', 'S']), 'lon': (180, ['E', 'W'])}
+
+report_columns = ['source', 'leg', 'site', 'hole', 'column', 'value', 'problem']
+
+
+def parse_coordinates(ser, axis):
+    # Decimal degrees of a column of coordinates, and the problem of every
+    # value that could not be used (None for the others)
+    max_degrees, hemispheres = limits[axis]
+    if is_numeric_dtype(ser):
+        values = ser.astype(float)
+        checks = [(ser.isna(), 'missing')]
+    else:
+        text = ser.where(ser.isna(), ser.astype(str))
+        parts = text.str.extract(coordinate_re)
+        degrees = parts['degrees'].astype(float).abs()
+        minutes = parts['minutes'].astype(float).fillna(0)
+        sign = (np.where(parts['degrees'].str.startswith('-', na=False), -1, 1) *
+                np.where(parts['hemisphere'].isin(['S', 'W']), -1, 1))
+        values = sign * (degrees + minutes / 60)
+        checks = [(ser.isna(), 'missing'),
+                  (parts['degrees'].isna(), 'unparseable'),
+                  (parts['hemisphere'].notna() & ~parts['hemisphere'].isin(hemispheres), 'hemisphere'),
+                  (minutes > 60, 'minutes out of range')]
+    checks.append((values.abs() > max_degrees, 'out of range'))
+    problems = pd.Series(np.select([check.to_numpy() for check, _ in checks],
+                                   [problem for _, problem in checks], None),
+                         index=ser.index)
+    return values.mask(problems.notna()), problems
+
+def parse_columns(data, source, columns=('lat', 'lon')):
+    # data with decimal-degree coordinates, and the report of its problems
+    data = data.copy()
+    reports = []
+    for col in columns:
+        raw = data[col]
+        data[col], problems = parse_coordinates(raw, col)
+        bad = problems.notna()
+        reports.append(data.loc[bad, ['leg', 'site', 'hole']].assign(
+            source=source, column=col, value=raw[bad], problem=problems[bad]))
+    return data, pd.concat(reports).reindex(columns=report_columns)
+
+# eof
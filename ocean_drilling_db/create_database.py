@@ -4,29 +4,220 @@
 Created on Wed Oct 24 15:01:56 2018
 
 @author: rick
+
+Export of the compiled datasets into a database.
+
+Tables are created from the dataset schemas (see ocean_drilling_db.schema)
+with typed columns, primary keys, and indexes on site_key and depth. Every
+depth-resolved table also gets the hole_key and site_key of its hole.
+
+With bulk, each table is written to a tab-separated staging file and
+loaded with the database's bulk loader: LOAD DATA LOCAL INFILE on MySQL and
+MariaDB, a single executemany transaction on SQLite. Otherwise rows are sent
+with to_sql in chunks of INSERTs.
+
+The database is either a MySQL/MariaDB server (create_db) or a single SQLite
+file (create_sqlite_db) that needs no server and can be copied next to a job.
+Both get views of iw_chem, mad, and cns joined with the coordinates and depths
+of their hole in hole_metadata (iw_chem_holes, mad_holes, cns_holes).
+
 """
+import os
+import re
+import tempfile
+
+from pandas.api.types import is_float_dtype, is_integer_dtype
+from sqlalchemy import (create_engine, MetaData, Table, Column, Index,
+                        BigInteger, Float, String, Text)
+
+from ocean_drilling_db import schema
+from ocean_drilling_db.registry import MetadataRegistry
+
+# Schema, primary key, and indexed columns of each table
+tables = {
+    'hole_metadata': (schema.hole_metadata, None, ['hole_key', 'leg'],
+                      [['site_key']]),
+    'age_depth': (schema.age_depth, None, [],
+                  [['site_key', 'depth']]),
+    'iw_chem': (schema.iw_chem, schema.iw_chem_default, ['sample_key', 'rep_key'],
+                [['site_key', 'sample_depth'], ['hole_key']]),
+    'mad': (schema.mad, None, [],
+            [['site_key', 'sample_depth'], ['hole_key']]),
+    'cns': (schema.cns, None, [],
+            [['site_key', 'sample_depth'], ['hole_key']]),
+}
+
+sql_types = {
+    schema.key: BigInteger,
+    schema.ident: lambda: String(255),
+    schema.number: lambda: Float(precision=53),
+    schema.text: Text,
+}
+
+# Tables joined with hole_metadata in a <table>_holes view
+hole_views = ['iw_chem', 'mad', 'cns']
+hole_columns = ['lat', 'lon', 'water_depth', 'total_penetration']
+
+# Escapes of the staging file format (MySQL's default LOAD DATA format)
+null_field = '\\N'
+escapes = {'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'}
+unescapes = {value: key for key, value in escapes.items()}
+
 
-from sqlalchemy import create_engine
+def column_dtype(ser, table_schema, default):
+    dtype = table_schema.get(ser.name, default)
+    if dtype is not None:
+        return dtype
+    if is_integer_dtype(ser):
+        return schema.key
+    elif is_float_dtype(ser):
+        return schema.number
+    return schema.text
 
+def define_table(metadata, name, data):
+    table_schema, default, primary_key, indexes = tables[name]
+    columns = []
+    for col in data.columns:
+        sql_type = sql_types[column_dtype(data[col], table_schema, default)]()
+        columns.append(Column(col, sql_type, primary_key=col in primary_key,
+                              autoincrement=False))
+    table = Table(name, metadata, *columns)
+    for index_cols in indexes:
+        if all(col in data.columns for col in index_cols):
+            Index('ix_{}_{}'.format(name, '_'.join(index_cols)),
+                  *[table.c[col] for col in index_cols])
+    return table
 
-def create_db(username, password, host, db_name, hole_metadata, age_depth, interstitial_water_chem, mad, cns):
+def prepare_tables(datasets):
+    # Add hole and site keys to depth-resolved tables, sort by primary key
+    registry = MetadataRegistry(datasets['hole_metadata'])
+    prepared = {}
+    for name, data in datasets.items():
+        if name in ('iw_chem', 'mad', 'cns'):
+            data = registry.assign_hole_keys(data)
+        primary_key = tables[name][2]
+        if primary_key:
+            data = data.sort_values(primary_key, kind='mergesort')
+        prepared[name] = data.reset_index(drop=True)
+    return prepared
+
+
+def staging_column(ser):
+    if is_float_dtype(ser):
+        strings = ser.astype(str)
+    else:
+        strings = schema.as_text(ser)
+        strings = strings.str.replace(r'[\\\t\n\r]', lambda m: escapes[m.group(0)], regex=True)
+    return strings.mask(ser.isna(), null_field)
+
+def write_staging_file(data, path):
+    columns = [staging_column(data[col]) for col in data.columns]
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        if len(data):
+            lines = columns[0].str.cat(columns[1:], sep='\t')
+            f.write('\n'.join(lines))
+            f.write('\n')
+
+def read_staging_rows(path, converters):
+    # Rows of a staging file, with each field passed through its column's converter
+    pattern = re.compile(r'\\[\\tnr]')
+    def unescape(field):
+        if '\\' in field:
+            return pattern.sub(lambda m: unescapes[m.group(0)], field)
+        return field
+    with open(path, encoding='utf-8', newline='\n') as f:
+        for line in f:
+            yield [None if field == null_field else convert(unescape(field))
+                   for field, convert in zip(line[:-1].split('\t'), converters)]
+
+def bulk_load(engine, table, path):
+    columns = [col.name for col in table.columns]
+    if engine.dialect.name == 'mysql':
+        with engine.begin() as connection:
+            connection.exec_driver_sql(
+                "LOAD DATA LOCAL INFILE '{}' INTO TABLE {} CHARACTER SET utf8mb4 "
+                "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+                "({})".format(path.replace('\\', '/'), table.name,
+                              ', '.join('`{}`'.format(col) for col in columns)))
+    elif engine.dialect.name == 'sqlite':
+        # Numbers are parsed here, SQLite's own text to REAL conversion is not exact
+        converters = [float if isinstance(col.type, Float) else
+                      int if isinstance(col.type, BigInteger) else str
+                      for col in table.columns]
+        connection = engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.executemany('INSERT INTO "{}" ({}) VALUES ({})'.format(
+                                   table.name,
+                                   ', '.join('"{}"'.format(col) for col in columns),
+                                   ', '.join('?' * len(columns))),
+                               read_staging_rows(path, converters))
+            connection.commit()
+        finally:
+            connection.close()
+    else:
+        raise ValueError('No bulk loader for {} databases'.format(engine.dialect.name))
+
+
+def drop_views(engine):
+    with engine.begin() as connection:
+        for name in hole_views:
+            connection.exec_driver_sql('DROP VIEW IF EXISTS {}_holes'.format(name))
+
+def create_views(engine, datasets):
+    with engine.begin() as connection:
+        for name in hole_views:
+            if name in datasets:
+                connection.exec_driver_sql(
+                    'CREATE VIEW {0}_holes AS SELECT d.*, {1} FROM {0} AS d '
+                    'LEFT JOIN hole_metadata AS h '
+                    'ON h.hole_key = d.hole_key AND h.leg = d.leg'.format(
+                        name, ', '.join('h.' + col for col in hole_columns)))
+
+def load_tables(engine, datasets, bulk=True, staging_dir=None):
+    # datasets: dict of table name to compiled DataFrame, including hole_metadata
+    datasets = prepare_tables(datasets)
+    metadata = MetaData()
+    db_tables = {name: define_table(metadata, name, data) for name, data in datasets.items()}
+    drop_views(engine)
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+    with tempfile.TemporaryDirectory(dir=staging_dir) as staging:
+        for name, data in datasets.items():
+            if bulk == True:
+                path = os.path.join(staging, name + '.tsv')
+                write_staging_file(data, path)
+                bulk_load(engine, db_tables[name], path)
+            else:
+                data.to_sql(name, con=engine, if_exists='append', chunksize=3000, index=False)
+    create_views(engine, datasets)
+
+def create_db(username, password, host, db_name, hole_metadata, age_depth, interstitial_water_chem, mad, cns, bulk=True):
     host_engine = create_engine('mysql://{}:{}@{}'.format(username, password, host)) # connect to server
     host_engine.execute("CREATE DATABASE IF NOT EXISTS {}".format(db_name)) #create db
-    engine = create_engine("mysql://{}:{}@{}/{}".format(username, password, host, db_name))
-
-    # Send hole metadata table to database
-    hole_metadata.to_sql(name='hole_metadata', con=engine, if_exists='replace', chunksize=3000, index=False)
+    engine = create_engine("mysql://{}:{}@{}/{}".format(username, password, host, db_name),
+                           connect_args={'local_infile': 1})
 
-    # Send Age-Depth table to database
-    age_depth.to_sql('age_depth', con=engine, if_exists='replace', chunksize=3000, index=False)
+    load_tables(engine, {'hole_metadata': hole_metadata,
+                         'age_depth': age_depth,
+                         'iw_chem': interstitial_water_chem,
+                         'mad': mad,
+                         'cns': cns}, bulk)
 
-    # Send Interstitial water data to database
-    interstitial_water_chem.to_sql('iw_chem', con=engine, if_exists='replace', chunksize=3000, index=False)
+def create_sqlite_db(path, hole_metadata, age_depth, interstitial_water_chem, mad, cns, bulk=True):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    engine = create_engine('sqlite:///{}'.format(path))
 
-    # Send Moisture and Density data to database
-    mad.to_sql('mad', con=engine, if_exists='replace', chunksize=3000, index=False)
+    load_tables(engine, {'hole_metadata': hole_metadata,
+                         'age_depth': age_depth,
+                         'iw_chem': interstitial_water_chem,
+                         'mad': mad,
+                         'cns': cns}, bulk)
 
-    # Send Carbon data to database
-    cns.to_sql('cns', con=engine, if_exists='replace', chunksize=3000, index=False)
+    # Compact the file and collect index statistics for the query planner
+    with engine.connect() as connection:
+        connection.exec_driver_sql('ANALYZE')
+        connection.exec_driver_sql('VACUUM')
 
-# eof
\ No newline at end of file
+# eof
@@ -42,6 +42,7 @@ iodp_meta = os.path.join('data','iodp','metadata','hole_summary_iodp.csv')
 iodp_mad = os.path.join('data','iodp','mad','mad_iodp.csv')
 iodp_iw = os.path.join('data','iodp','iw','iw_iodp.csv')
 iodp_age_depth = os.path.join('data','iodp','age_depth')
+iodp_age_depth_cache = os.path.join('data','iodp','age_depth','.cache')
 iodp_carbon = os.path.join('data','iodp','cns','carbon_iodp.csv')
 
 # Chikyu data locations
@@ -50,5 +51,18 @@ chikyu_mad = os.path.join('data','chikyu','mad')
 chikyu_iw = os.path.join('data','chikyu','iw')
 chikyu_carbon = os.path.join('data','chikyu','cns')
 
+# Output locations
+columnar_output = os.path.join('output','columnar')
+manifest = os.path.join('output','manifest.json')
+loader_cache = os.path.join('output','cache')
+sqlite_db = os.path.join('output','ocean_drilling_db.sqlite')
+porosity_fits = os.path.join('output','porosity_fits.csv')
+resampled_output = os.path.join('output','resampled')
+diffusive_fluxes = os.path.join('output','diffusive_fluxes.csv')
+stage_report = os.path.join('output','stage_report.json')
+stage_profiles = os.path.join('output','profiles')
+hole_cache = os.path.join('output','hole_cache')
+coordinate_report = os.path.join('output','coordinate_report.csv')
+
 
 
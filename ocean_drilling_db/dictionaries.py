@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 13:05:52 2026
+
+Global dictionaries of the identifier columns shared by every dataset.
+
+Each identifier column (leg, site, hole, core, section, type, method,
+data_source) is a categorical whose dictionary is shared by hole_metadata,
+age_depth, iw_chem, mad, and cns, so a value has the same integer code in
+every dataset. The leg, site, and hole dictionaries start with the values of
+hole_metadata; values found only in the datasets follow in sorted order.
+
+Datasets with the same dictionaries are concatenated without recoding, and
+joins on these columns compare codes: pandas merges equal categorical dtypes
+on their codes, and MetadataRegistry looks up hole and site keys by code.
+
+"""
+import pandas as pd
+from pandas.api.types import is_categorical_dtype
+
+from ocean_drilling_db import schema
+
+shared_columns = ['leg', 'site', 'hole', 'core', 'section', 'type', 'method', 'data_source']
+
+
+def column_values(ser):
+    # Distinct non-missing values of a column as text
+    if not is_categorical_dtype(ser):
+        ser = schema.as_category(ser)
+    return ser.cat.remove_unused_categories().cat.categories
+
+
+class SharedDictionaries:
+    def __init__(self, hole_metadata, datasets=()):
+        # datasets: the compiled frames to be encoded
+        self.dtypes = {}
+        for col in shared_columns:
+            known = column_values(hole_metadata[col]) if col in hole_metadata.columns else pd.Index([])
+            found = [column_values(data[col]) for data in datasets if col in data.columns]
+            other = known[:0].append(found).unique().difference(known) if found else pd.Index([])
+            self.dtypes[col] = pd.CategoricalDtype(known.append(other.sort_values()).astype(object))
+
+    def encode(self, data):
+        # data with every shared column recoded to its global dictionary
+        data = data.copy(deep=False)
+        for col in shared_columns:
+            if col in data.columns:
+                ser = data[col] if is_categorical_dtype(data[col]) else schema.as_category(data[col])
+                data[col] = ser.cat.set_categories(self.dtypes[col].categories)
+        return data
+
+# eof
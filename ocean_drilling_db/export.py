@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 15:21:08 2026
+
+Columnar export of the compiled datasets.
+
+Each dataset is written twice:
+    Parquet, sorted by site_key (or leg for datasets without site keys) with
+    row groups that never split a site/leg, so readers can prune columns and
+    skip row groups using the column statistics.
+    Arrow IPC (uncompressed), which can be memory-mapped without a copy.
+
+Requires pyarrow.
+
+"""
+import os
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pandas.api.types import is_categorical_dtype
+
+# Target number of rows per Parquet row group / Arrow record batch
+row_group_size = 65536
+
+
+def partition_column(data):
+    return 'site_key' if 'site_key' in data.columns else 'leg'
+
+def row_group_bounds(values, target_rows):
+    # Start and end rows of row groups made of whole runs of equal values
+    run_starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+    bounds = [0]
+    for start in run_starts[1:]:
+        if start - bounds[-1] >= target_rows:
+            bounds.append(start)
+    bounds.append(len(values))
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def sort_key(ser):
+    # Categoricals (e.g. leg with the shared dictionaries) are sorted by their values,
+    # the order of the Parquet min/max statistics, not by their category order
+    return ser.astype(object) if is_categorical_dtype(ser) else ser
+
+def to_table(data, partition_col):
+    data = data.sort_values(partition_col, kind='mergesort', key=sort_key).reset_index(drop=True)
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    values = data[partition_col].astype(str).to_numpy()
+    return table, row_group_bounds(values, row_group_size)
+
+def write_parquet(table, bounds, path):
+    with pq.ParquetWriter(path, table.schema, compression='snappy') as writer:
+        for start, end in bounds:
+            writer.write_table(table.slice(start, end - start), row_group_size=end - start)
+
+def write_arrow(table, bounds, path):
+    with pa.OSFile(path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            for start, end in bounds:
+                writer.write_table(table.slice(start, end - start))
+
+def write_dataset(data, name, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    table, bounds = to_table(data, partition_column(data))
+    write_parquet(table, bounds, os.path.join(out_dir, name + '.parquet'))
+    write_arrow(table, bounds, os.path.join(out_dir, name + '.arrow'))
+
+def export_datasets(datasets, out_dir):
+    # datasets: dict of dataset name to compiled DataFrame
+    for name, data in datasets.items():
+        write_dataset(data, name, out_dir)
+
+
+def read_parquet(path, columns=None, filters=None):
+    # e.g. filters=[('site_key', 'in', [12, 40, 311])]
+    return pq.read_table(path, columns=columns, filters=filters).to_pandas()
+
+def open_arrow(path):
+    # Memory-mapped Arrow table, column buffers are not copied into memory
+    return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+# eof
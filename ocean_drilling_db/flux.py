@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 23:19:37 2026
+
+Diffusive fluxes across the seafloor from pore water concentration gradients.
+
+For every hole and analyte, the near-seafloor gradient dC/dz is the
+least-squares slope of the concentrations within gradient_depth of the
+seafloor, computed for all (hole, analyte) pairs at once from per-pair sums.
+The flux follows Fick's first law,
+
+    J = -porosity * Ds * dC/dz,    Ds = D0 / (1 - ln(porosity**2))
+
+with the free-solution diffusivity D0 = (m0 + m1 * T) * 1e-6 cm2/s of
+Boudreau (1997) and his tortuosity correction. Porosity is the mean MAD
+porosity of the hole over the same depth interval.
+
+Concentrations are in mM (mol/m3) and depths in m, so gradients are in mM/m,
+diffusivities in m2/yr, and fluxes in mol/m2/yr, positive downward (into the
+sediment).
+
+"""
+import numpy as np
+import pandas as pd
+
+# Free-solution diffusion coefficients, D0 = (m0 + m1 * T[C]) * 1e-6 cm2/s
+diffusion_coefficients = {
+    'SO4': (4.88, 0.232),
+    'NH4': (9.50, 0.413),
+    'Ca': (3.60, 0.179),
+    'Mg': (3.43, 0.144),
+}
+
+# Depth below seafloor (m) of the samples used for gradients and porosity
+gradient_depth = 20.0
+
+# Minimum number of samples in a gradient
+min_samples = 3
+
+seconds_per_year = 365.25 * 24 * 3600
+
+
+def free_diffusivity(analyte, temperature):
+    # D0 in m2/yr
+    m0, m1 = diffusion_coefficients[analyte]
+    return (m0 + m1 * temperature) * 1e-6 * 1e-4 * seconds_per_year
+
+def near_seafloor(data, registry, columns):
+    # Long table of hole_key, site_key, sample_depth, column, value within gradient_depth
+    data = registry.assign_hole_keys(data)
+    data = data[data['hole_key'].notna() & (data['sample_depth'] >= 0) &
+                (data['sample_depth'] <= gradient_depth)]
+    data = data[['hole_key', 'site_key', 'sample_depth'] + columns]
+    data = data.melt(id_vars=['hole_key', 'site_key', 'sample_depth'],
+                     var_name='analyte').dropna(subset=['value'])
+    return data.reset_index(drop=True)
+
+def gradients(samples):
+    # Least-squares slope of value over sample_depth for every (hole_key, analyte)
+    pairs, group = np.unique(np.stack([samples['hole_key'].to_numpy(dtype='int64'),
+                                       pd.factorize(samples['analyte'])[0]]), axis=1,
+                             return_inverse=True)
+    z = samples['sample_depth'].to_numpy(dtype=float)
+    c = samples['value'].to_numpy(dtype=float)
+    n_groups = pairs.shape[1]
+    count = np.bincount(group, minlength=n_groups).astype(float)
+    sum_z = np.bincount(group, z, n_groups)
+    sum_c = np.bincount(group, c, n_groups)
+    sum_zz = np.bincount(group, z * z, n_groups)
+    sum_zc = np.bincount(group, z * c, n_groups)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (count * sum_zc - sum_z * sum_c) / (count * sum_zz - sum_z ** 2)
+    first = np.unique(group, return_index=True)[1]
+    result = samples.iloc[first][['hole_key', 'site_key', 'analyte']].reset_index(drop=True)
+    return result.assign(n_samples=count.astype(int), gradient=slope)
+
+def diffusive_fluxes(iw_chem, mad, registry, analytes=None, temperature=2.0):
+    # Table of one row per hole and analyte with gradient, porosity, and flux
+    if analytes is None:
+        analytes = [analyte for analyte in diffusion_coefficients if analyte in iw_chem.columns]
+    fluxes = gradients(near_seafloor(iw_chem, registry, analytes))
+    fluxes = fluxes[(fluxes['n_samples'] >= min_samples) & np.isfinite(fluxes['gradient'])]
+
+    porosity = near_seafloor(mad, registry, ['porosity'])
+    porosity = porosity[(porosity['value'] > 0) & (porosity['value'] < 1)]
+    porosity = porosity.groupby('hole_key')['value'].mean().rename('porosity')
+    fluxes = fluxes.merge(porosity, how='left', left_on='hole_key', right_index=True)
+
+    d0 = fluxes['analyte'].map({analyte: free_diffusivity(analyte, temperature)
+                                for analyte in analytes})
+    fluxes['diffusivity'] = d0 / (1 - np.log(fluxes['porosity'] ** 2))
+    fluxes['flux'] = -fluxes['porosity'] * fluxes['diffusivity'] * fluxes['gradient']
+    fluxes = fluxes.sort_values(['hole_key', 'analyte'], kind='mergesort')
+    return fluxes.reset_index(drop=True)
+
+# eof
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 15:44:18 2026
+
+Memory-mapped per-hole cache of the depth-resolved datasets (iw_chem, mad,
+cns), for tools that read one or a few holes at a time.
+
+Each dataset is stored in <cache_dir>/<name>/ with its rows sorted by
+(hole_key, depth), one .npy file per column:
+    float64 for measurements
+    int64 for integer keys, -1 where missing
+    integer codes for identifiers and text, with the categories in meta.json
+and holes.npy, the (hole_key, offset, length) of every hole in key order.
+Rows without a known hole are not cached. Columns are opened with
+np.load(mmap_mode='r'), so a hole's profile is a slice of the memory map (no
+copy, and pages are shared by every process that opens the cache).
+
+meta.json holds a fingerprint of the compiled dataset with its hole keys (from
+the registry for datasets without their own), so new hole metadata that shifts
+the keys invalidates the cache too. write_hole_cache leaves a cache with the
+same fingerprint as it is and otherwise rebuilds it in a temporary directory
+that replaces the old one, so a rebuilt dataset always invalidates its cache
+and open memory maps stay valid.
+
+"""
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_categorical_dtype, is_integer_dtype
+
+
+def dataset_fingerprint(data):
+    sha = hashlib.sha1(pd.util.hash_pandas_object(data).values.tobytes())
+    sha.update(json.dumps([str(col) for col in data.columns]).encode())
+    return sha.hexdigest()
+
+def cache_fingerprint(path):
+    meta_path = os.path.join(path, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        return json.load(f)['fingerprint']
+
+def column_array(ser):
+    # (kind, typed array, categories) of a column
+    if is_categorical_dtype(ser) or ser.dtype == object:
+        if not is_categorical_dtype(ser):
+            ser = ser.astype('category')
+        return 'codes', ser.cat.codes.to_numpy(), [str(value) for value in ser.cat.categories]
+    elif is_integer_dtype(ser):
+        return 'key', ser.to_numpy(dtype='int64', na_value=-1), None
+    return 'number', ser.to_numpy(dtype='float64', na_value=np.nan), None
+
+def write_hole_cache(data, name, registry, cache_dir, depth_col='sample_depth'):
+    path = os.path.join(cache_dir, name)
+    if 'hole_key' not in data.columns:
+        data = registry.assign_hole_keys(data)
+    fingerprint = dataset_fingerprint(data)
+    if cache_fingerprint(path) == fingerprint:
+        return path
+
+    data = data[data['hole_key'].notna()]
+    data = data.sort_values(['hole_key', depth_col], kind='mergesort')
+
+    temp_path = path + '.tmp'
+    shutil.rmtree(temp_path, ignore_errors=True)
+    os.makedirs(temp_path)
+    columns = []
+    for n, col in enumerate(data.columns):
+        kind, values, categories = column_array(data[col])
+        np.save(os.path.join(temp_path, '{}.npy'.format(n)), values)
+        columns.append({'name': col, 'file': '{}.npy'.format(n), 'kind': kind,
+                        'categories': categories})
+
+    hole_keys = data['hole_key'].to_numpy(dtype='int64')
+    keys, offsets, lengths = np.unique(hole_keys, return_index=True, return_counts=True)
+    np.save(os.path.join(temp_path, 'holes.npy'), np.stack([keys, offsets, lengths], axis=1))
+    with open(os.path.join(temp_path, 'meta.json'), 'w') as f:
+        json.dump({'fingerprint': fingerprint, 'rows': len(data), 'depth_column': depth_col,
+                   'columns': columns}, f)
+
+    # Swap the new cache in, processes with the old one mapped keep its files
+    old_path = path + '.old'
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    os.replace(temp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    return path
+
+def write_hole_caches(datasets, registry, cache_dir):
+    # datasets: dict of dataset name to compiled depth-resolved DataFrame
+    return {name: write_hole_cache(data, name, registry, cache_dir) for name, data in datasets.items()}
+
+
+class HoleCache:
+    def __init__(self, path):
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        self.fingerprint = meta['fingerprint']
+        self.depth_col = meta['depth_column']
+        self.kinds = {col['name']: col['kind'] for col in meta['columns']}
+        self.categories = {col['name']: col['categories'] for col in meta['columns']}
+        # Zero-length files cannot be memory-mapped
+        mmap_mode = 'r' if meta['rows'] > 0 else None
+        self.columns = {col['name']: np.load(os.path.join(path, col['file']), mmap_mode=mmap_mode)
+                        for col in meta['columns']}
+        holes = np.load(os.path.join(path, 'holes.npy'))
+        self.hole_keys, self.offsets, self.lengths = holes[:, 0], holes[:, 1], holes[:, 2]
+
+    def hole_range(self, hole_key):
+        # First row and end row of a hole, empty for holes not in the cache
+        n = np.searchsorted(self.hole_keys, hole_key)
+        if n == len(self.hole_keys) or self.hole_keys[n] != hole_key:
+            return 0, 0
+        return self.offsets[n], self.offsets[n] + self.lengths[n]
+
+    def views(self, hole_key, columns=None):
+        # Dict of column to the rows of a hole, slices of the memory maps
+        start, end = self.hole_range(hole_key)
+        if columns is None:
+            columns = list(self.columns)
+        return {col: self.columns[col][start:end] for col in columns}
+
+    def profile(self, hole_key, columns=None):
+        # DataFrame of the rows of a hole, with keys and identifiers decoded
+        profile = {}
+        for col, values in self.views(hole_key, columns).items():
+            if self.kinds[col] == 'codes':
+                profile[col] = pd.Categorical.from_codes(values, self.categories[col])
+            elif self.kinds[col] == 'key':
+                profile[col] = pd.arrays.IntegerArray(np.array(values), values < 0)
+            else:
+                profile[col] = np.array(values)
+        return pd.DataFrame(profile)
+
+
+def open_hole_caches(cache_dir, names=('iw_chem', 'mad', 'cns')):
+    return {name: HoleCache(os.path.join(cache_dir, name)) for name in names
+            if os.path.exists(os.path.join(cache_dir, name, 'meta.json'))}
+
+# eof
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 11:02:15 2026
+
+Resolver for attributing a data file to a single drilling hole.
+
+Chikyu data files have no leg/site/hole columns, only sample labels that
+contain the hole ID (site + hole, e.g. 'C0002F'). The resolver compiles every
+known hole ID into one regex alternation, so a file's hole is found with a
+single pass over the unique values of its text columns.
+
+"""
+import re
+
+
+class HoleResolver:
+    def __init__(self, holes):
+        # holes: DataFrame with leg, site, and hole columns
+        holes = holes[['leg', 'site', 'hole']].dropna().astype(str)
+        hole_ids = holes['site'] + holes['hole']
+        self.holes = dict(zip(hole_ids, zip(holes['leg'], holes['site'], holes['hole'])))
+
+        # Longest IDs first so that an ID is never shadowed by its own prefix.
+        # Without holes there is no pattern (an empty alternation matches everywhere)
+        ids = sorted(self.holes, key=len, reverse=True)
+        if ids:
+            self.pattern = re.compile('|'.join(re.escape(hole_id) for hole_id in ids))
+        else:
+            self.pattern = None
+
+    def find_holes(self, data):
+        if self.pattern is None:
+            return []
+        found = set()
+        for col in data.select_dtypes(include='object'):
+            for text in data[col].dropna().unique():
+                found.update(self.pattern.findall(str(text)))
+        return sorted(found)
+
+    def resolve(self, data, source=''):
+        # Return (leg, site, hole) for the single hole named in data, else None
+        hole_ids = self.find_holes(data)
+        if len(hole_ids) == 1:
+            return self.holes[hole_ids[0]]
+        if len(hole_ids) == 0:
+            print('No hole ID found in {}, file skipped.'.format(source))
+        else:
+            print('Multiple hole IDs ({}) found in {}, file skipped.'.format(
+                ', '.join(hole_ids), source))
+        return None
+
+
+def chikyu_resolver(hole_metadata):
+    chikyu_holes = hole_metadata[hole_metadata['site'].astype(str).str.startswith('C0')]
+    return HoleResolver(chikyu_holes)
+
+# eof
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 23:50:12 2026
+
+Timing and memory instrumentation of the compile stages and loaders.
+
+A Report collects one record per measured call:
+    name: module.function
+    wall_s: elapsed time
+    cpu_s: CPU time of the thread running the call, of child processes it
+        waited for (e.g. a pool it shut down), and of the measured loaders it
+        ran on pool workers
+    peak_rss_mb: peak resident memory of the process during the call
+    rows, columns: shape of the returned DataFrame
+    pid: process that ran the call (loaders may run on a process pool)
+    cached: True if the output was read from the manifest cache instead
+and writes them as a JSON report. With a profile directory, every call is also
+run under cProfile and its stats are written to <profile_dir>/<name>.prof
+(view with python -m pstats or snakeviz).
+
+On Linux the peak resident memory of the process (VmHWM) is reset at the start
+of every call, and the peak of each call in progress is kept up to date at every
+reset, so nested calls each get their own peak. Calls that overlap in one
+process (the compile stages of a parallel run) share the peak of the overlap.
+Where the peak cannot be reset (e.g. macOS) it is the peak of the process so far.
+
+"""
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+# Peak memory of the calls in progress in this process, and of the process
+active_peaks = {}
+process_peak = {'rss_mb': 0.0}
+peak_lock = threading.Lock()
+
+# CPU time of pool workers spent for the calls in progress in each thread
+worker_cpu = threading.local()
+
+
+def peak_rss_mb():
+    # VmHWM on Linux, which reset_peak_rss can restart
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+def reset_peak_rss():
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+def update_peaks():
+    # Fold the current peak into every call in progress and the process peak,
+    # False if memory cannot be measured (call with peak_lock held)
+    peak = peak_rss_mb()
+    if peak is None:
+        return False
+    for call_peak in list(active_peaks.values()) + [process_peak]:
+        call_peak['rss_mb'] = max(call_peak['rss_mb'], peak)
+    return True
+
+def start_peak():
+    call_peak = {'rss_mb': 0.0}
+    with peak_lock:
+        update_peaks()
+        reset_peak_rss()
+        active_peaks[id(call_peak)] = call_peak
+    return call_peak
+
+def end_peak(call_peak):
+    with peak_lock:
+        measured = update_peaks()
+        del active_peaks[id(call_peak)]
+    return call_peak['rss_mb'] if measured else None
+
+def process_peak_rss_mb():
+    with peak_lock:
+        return process_peak['rss_mb'] if update_peaks() else None
+
+def reset_after_fork():
+    # Pool workers forked while another thread held the lock start with a free one
+    global peak_lock
+    peak_lock = threading.Lock()
+    active_peaks.clear()
+    process_peak['rss_mb'] = 0.0
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reset_after_fork)
+
+def add_worker_cpu(seconds):
+    # Count CPU time a pool worker spent for the innermost call in progress in this thread
+    calls = getattr(worker_cpu, 'calls', None)
+    if calls:
+        calls[-1] += seconds
+
+def children_cpu():
+    times = os.times()
+    return times.children_user + times.children_system
+
+def call_name(func):
+    return '{}.{}'.format(func.__module__, func.__name__)
+
+def measured_call(func, args, profile_dir=None):
+    # Run func(*args), return its result and a record of the call
+    name = call_name(func)
+    profiler = cProfile.Profile() if profile_dir is not None else None
+    if not hasattr(worker_cpu, 'calls'):
+        worker_cpu.calls = []
+    worker_cpu.calls.append(0.0)
+    call_peak = start_peak()
+    wall = time.perf_counter()
+    cpu = time.thread_time()
+    children = children_cpu()
+    try:
+        if profiler is not None:
+            result = profiler.runcall(func, *args)
+        else:
+            result = func(*args)
+    finally:
+        workers = worker_cpu.calls.pop()
+        add_worker_cpu(workers)
+        peak = end_peak(call_peak)
+    record = {'name': name,
+              'wall_s': time.perf_counter() - wall,
+              'cpu_s': time.thread_time() - cpu + children_cpu() - children + workers,
+              'peak_rss_mb': peak,
+              'rows': None, 'columns': None,
+              'pid': os.getpid(),
+              'cached': False}
+    if hasattr(result, 'shape') and len(result.shape) == 2:
+        record['rows'], record['columns'] = int(result.shape[0]), int(result.shape[1])
+    if profiler is not None:
+        os.makedirs(profile_dir, exist_ok=True)
+        profiler.dump_stats(os.path.join(profile_dir, name + '.prof'))
+    return result, record
+
+
+class Report:
+    def __init__(self, profile_dir=None):
+        self.profile_dir = profile_dir
+        self.records = []
+        self.lock = threading.Lock()
+        self.started = time.time()
+
+    def add(self, record):
+        # Loaders measured on pool workers count towards the call waiting for them
+        if record['pid'] != os.getpid():
+            add_worker_cpu(record['cpu_s'])
+        with self.lock:
+            self.records.append(record)
+
+    def call(self, func, *args):
+        result, record = measured_call(func, args, self.profile_dir)
+        self.add(record)
+        return result
+
+    def add_cached(self, func, result):
+        record = {'name': call_name(func), 'wall_s': 0.0, 'cpu_s': 0.0,
+                  'peak_rss_mb': None, 'rows': None, 'columns': None,
+                  'pid': os.getpid(), 'cached': True}
+        if hasattr(result, 'shape') and len(result.shape) == 2:
+            record['rows'], record['columns'] = int(result.shape[0]), int(result.shape[1])
+        self.add(record)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self.lock:
+            report = {'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+                      'total_wall_s': time.time() - self.started,
+                      'peak_rss_mb': process_peak_rss_mb(),
+                      'stages': list(self.records)}
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=1)
+
+
+def run_stage(report, func, *args):
+    # func(*args), measured if there is a report
+    if report is None:
+        return func(*args)
+    return report.call(func, *args)
+
+# eof
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 16:48:52 2026
+
+Source-file manifest for incremental rebuilds.
+
+The manifest records the content hash of every input file under data/, and
+which dataset and source (DSDP, ODP, IODP, Chikyu) each file feeds. Each
+load_* output is cached together with a digest of its inputs (source files,
+loader code and every ocean_drilling_db module it may use, and the hole
+metadata it is given). On a rerun only loaders whose
+digest changed are recomputed, the rest are read back from the cache.
+
+Files are re-hashed only when their size or mtime changed.
+
+"""
+import hashlib
+import inspect
+import json
+import os
+import threading
+
+import pandas as pd
+
+from ocean_drilling_db import data_filepaths as dfp
+
+# Dataset, source, and input paths (files or directories) of each loader
+loader_sources = {
+    'age_depth.load_dsdp_age_depth': ('age_depth', 'dsdp', [dfp.dsdp_age_depth]),
+    'age_depth.load_odp_age_depth': ('age_depth', 'odp', [dfp.odp_age_depth]),
+    'age_depth.load_odp_age_profiles': ('age_depth', 'odp', [dfp.odp_age_profile]),
+    'age_depth.load_iodp_age_depth': ('age_depth', 'iodp', [dfp.iodp_age_depth]),
+    'iw_chem.load_dsdp_iw': ('iw_chem', 'dsdp', [dfp.dsdp_iw]),
+    'iw_chem.load_odp_iw': ('iw_chem', 'odp', [dfp.odp_iw]),
+    'iw_chem.load_iodp_iw': ('iw_chem', 'iodp', [dfp.iodp_iw]),
+    'iw_chem.load_chikyu_iw': ('iw_chem', 'chikyu', [dfp.chikyu_iw]),
+    'mad.load_dsdp_mad': ('mad', 'dsdp', [dfp.dsdp_mad]),
+    'mad.load_odp_mad': ('mad', 'odp', [dfp.odp_mad]),
+    'mad.load_iodp_mad': ('mad', 'iodp', [dfp.iodp_mad]),
+    'mad.load_chikyu_mad': ('mad', 'chikyu', [dfp.chikyu_mad]),
+    'cns.load_dsdp_cns': ('cns', 'dsdp', [dfp.dsdp_carbon]),
+    'cns.load_odp_cns': ('cns', 'odp', [dfp.odp_carbon]),
+    'cns.load_iodp_cns': ('cns', 'iodp', [dfp.iodp_carbon]),
+    'cns.load_chikyu_cns': ('cns', 'chikyu', [dfp.chikyu_carbon]),
+}
+
+
+def loader_name(func):
+    return '{}.{}'.format(func.__module__, func.__name__)
+
+def list_files(path):
+    # All files under a directory, skipping hidden directories such as caches
+    if os.path.isfile(path):
+        return [path]
+    files = []
+    for root, dirs, filenames in os.walk(path):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        files.extend(os.path.join(root, filename) for filename in sorted(filenames))
+    return files
+
+def package_files():
+    # Source of every ocean_drilling_db module (schema, streaming, registry, ...)
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    return sorted(os.path.join(package_dir, filename) for filename in os.listdir(package_dir)
+                  if filename.endswith('.py'))
+
+def hash_file(path):
+    sha = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+def hash_argument(arg):
+    # Objects such as the metadata registry carry their own fingerprint
+    if hasattr(arg, 'fingerprint'):
+        return arg.fingerprint
+    if isinstance(arg, (pd.DataFrame, pd.Series)):
+        return hashlib.sha1(pd.util.hash_pandas_object(arg).values.tobytes()).hexdigest()
+    return hashlib.sha1(repr(arg).encode()).hexdigest()
+
+
+class Manifest:
+    def __init__(self, path, cache_dir):
+        self.path = path
+        self.cache_dir = cache_dir
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as f:
+                manifest = json.load(f)
+        else:
+            manifest = {}
+        self.files = manifest.get('files', {})
+        self.loaders = manifest.get('loaders', {})
+
+    def file_hash(self, path, feeds=None):
+        stat = os.stat(path)
+        with self.lock:
+            record = self.files.get(path)
+        if record is None or record['size'] != stat.st_size or record['mtime_ns'] != stat.st_mtime_ns:
+            record = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                      'sha1': hash_file(path), 'feeds': []}
+        if feeds is not None and feeds not in record['feeds']:
+            record['feeds'].append(feeds)
+        with self.lock:
+            self.files[path] = record
+        return record['sha1']
+
+    def digest(self, func, args):
+        name = loader_name(func)
+        sha = hashlib.sha1()
+        # Loader code and the package code it runs on
+        for code_file in [inspect.getsourcefile(func)] + package_files():
+            sha.update(self.file_hash(code_file).encode())
+        if name in loader_sources:
+            dataset, source, paths = loader_sources[name]
+            for path in paths:
+                for file in list_files(path):
+                    sha.update(file.encode())
+                    sha.update(self.file_hash(file, [dataset, source]).encode())
+        for arg in args:
+            sha.update(hash_argument(arg).encode())
+        return sha.hexdigest()
+
+    def cache_path(self, func):
+        return os.path.join(self.cache_dir, loader_name(func) + '.pkl')
+
+    def load(self, func, digest):
+        # Cached output of func if its inputs are unchanged, otherwise None
+        with self.lock:
+            record = self.loaders.get(loader_name(func))
+        cache_path = self.cache_path(func)
+        if record is not None and record['digest'] == digest and os.path.exists(cache_path):
+            return pd.read_pickle(cache_path)
+        return None
+
+    def store(self, func, digest, data):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        data.to_pickle(self.cache_path(func))
+        with self.lock:
+            self.loaders[loader_name(func)] = {'digest': digest}
+            self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump({'files': self.files, 'loaders': self.loaders}, f, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+# eof
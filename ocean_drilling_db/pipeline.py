@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 09:12:40 2026
+
+Helpers for running the independent load_* functions of each dataset, either
+one after another or concurrently on a process pool.
+
+Each loader is given as a tuple of the function followed by its arguments,
+e.g. (load_chikyu_iw, hole_metadata). Results are always returned in the
+order the loaders were given, so the concatenated datasets are identical to
+a serial run.
+
+With a manifest (see ocean_drilling_db.manifest), loaders whose inputs are
+unchanged since the last run are read back from the cache instead of rerun.
+
+With a report (see ocean_drilling_db.instrument), every loader call is timed
+in the process that runs it and recorded.
+
+"""
+from ocean_drilling_db.instrument import measured_call
+
+
+def run_loaders(loaders, executor=None, manifest=None, report=None):
+    results = [None] * len(loaders)
+    digests = [None] * len(loaders)
+    pending = []
+    for n, (func, *args) in enumerate(loaders):
+        if manifest is not None:
+            digests[n] = manifest.digest(func, args)
+            results[n] = manifest.load(func, digests[n])
+        if results[n] is None:
+            pending.append(n)
+
+    if report is not None:
+        for n in range(len(loaders)):
+            if n not in pending:
+                report.add_cached(loaders[n][0], results[n])
+
+    # Serial run
+    if executor is None:
+        for n in pending:
+            func, *args = loaders[n]
+            if report is not None:
+                results[n] = report.call(func, *args)
+            else:
+                results[n] = func(*args)
+    # Submit every loader first, then collect results in the original order
+    else:
+        if report is not None:
+            futures = {n: executor.submit(measured_call, loaders[n][0], loaders[n][1:],
+                                          report.profile_dir) for n in pending}
+        else:
+            futures = {n: executor.submit(loaders[n][0], *loaders[n][1:]) for n in pending}
+        for n in pending:
+            results[n] = futures[n].result()
+            if report is not None:
+                results[n], record = results[n]
+                report.add(record)
+
+    if manifest is not None:
+        for n in pending:
+            manifest.store(loaders[n][0], digests[n], results[n])
+    return results
+
+# eof
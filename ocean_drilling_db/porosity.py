@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 22:08:41 2026
+
+Exponential porosity-depth (compaction) fits of every hole in the MAD dataset.
+
+    porosity(z) = phi_inf + (phi0 - phi_inf) * exp(-z / decay_length)
+
+For a fixed decay length the model is linear in phi_inf and phi0 - phi_inf, so
+it is solved in closed form for all holes at once from per-hole sums
+(np.bincount over the hole index of every sample). The decay length of each
+hole is the physically valid one with the least squared error on a logarithmic
+grid. Holes are split into chunks that can be fitted in parallel on an
+executor, or on a pool of n_workers processes opened for the fit.
+
+Porosity is a fraction (as in the MAD dataset), depth and decay length in m.
+
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Decay lengths (m) tried for every hole
+decay_lengths = np.logspace(0, 4, 401)
+
+# Minimum number of samples in a fitted hole
+min_samples = 5
+
+# Only fits with 0 <= phi_inf <= phi0 <= max_porosity (porosity decreasing with
+# depth) are accepted, holes with none get no parameters
+max_porosity = 1.0
+
+
+def fit_holes(hole_index, depth, porosity, n_holes):
+    # Best fit of every hole over decay_lengths, arrays indexed by hole
+    count = np.bincount(hole_index, minlength=n_holes).astype(float)
+    sum_y = np.bincount(hole_index, porosity, n_holes)
+    best_sse = np.full(n_holes, np.inf)
+    best = np.full((3, n_holes), np.nan)
+    for length in decay_lengths:
+        x = np.exp(-depth / length)
+        sum_x = np.bincount(hole_index, x, n_holes)
+        sum_xx = np.bincount(hole_index, x * x, n_holes)
+        sum_xy = np.bincount(hole_index, x * porosity, n_holes)
+        # Lengths over which exp(-z/length) barely varies within a hole are not fitted
+        spread = count * sum_xx - sum_x ** 2
+        spread[spread <= 1e-9 * count * sum_xx] = np.nan
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = (count * sum_xy - sum_x * sum_y) / spread
+            intercept = (sum_y - slope * sum_x) / count
+            residual = porosity - intercept[hole_index] - slope[hole_index] * x
+        sse = np.bincount(hole_index, residual ** 2, n_holes)
+        valid = (intercept >= 0) & (slope >= 0) & (intercept + slope <= max_porosity)
+        better = valid & np.isfinite(sse) & (sse < best_sse)
+        best_sse[better] = sse[better]
+        best[:, better] = [intercept[better] + slope[better], intercept[better],
+                           np.full(better.sum(), length)]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rmse = np.sqrt(np.where(np.isfinite(best_sse), best_sse, np.nan) / count)
+    return best[0], best[1], best[2], rmse, count
+
+def fit_chunk(chunk):
+    # chunk: (hole_keys, depth, porosity) of whole holes
+    hole_keys, depth, porosity = chunk
+    keys, hole_index = np.unique(hole_keys, return_inverse=True)
+    phi0, phi_inf, decay_length, rmse, count = fit_holes(hole_index, depth, porosity, len(keys))
+    return pd.DataFrame({'hole_key': keys, 'n_samples': count.astype(int),
+                         'phi0': phi0, 'phi_inf': phi_inf,
+                         'decay_length': decay_length, 'rmse': rmse})
+
+def fit_porosity(mad, registry, executor=None, n_chunks=None):
+    # Table of fit parameters, one row per hole with at least min_samples samples
+    samples = registry.assign_hole_keys(mad)[['hole_key', 'site_key', 'sample_depth', 'porosity']]
+    samples = samples.dropna()
+    samples = samples[samples['sample_depth'] >= 0]
+    samples = samples[samples.groupby('hole_key')['hole_key'].transform('size') >= min_samples]
+    samples = samples.sort_values('hole_key', kind='mergesort')
+
+    hole_keys = samples['hole_key'].to_numpy(dtype='int64')
+    depth = samples['sample_depth'].to_numpy(dtype=float)
+    porosity = samples['porosity'].to_numpy(dtype=float)
+
+    # Chunks of whole holes, one per worker
+    if n_chunks is None:
+        n_chunks = 1 if executor is None else os.cpu_count()
+    holes = np.unique(hole_keys)
+    starts = [np.searchsorted(hole_keys, part[0]) for part in np.array_split(holes, n_chunks) if len(part)]
+    bounds = np.r_[starts or [0], len(hole_keys)]
+    chunks = [(hole_keys[a:b], depth[a:b], porosity[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+
+    if executor is None:
+        fits = [fit_chunk(chunk) for chunk in chunks]
+    else:
+        fits = list(executor.map(fit_chunk, chunks))
+    fits = pd.concat(fits, ignore_index=True)
+
+    site_keys = samples.drop_duplicates('hole_key').set_index('hole_key')['site_key']
+    fits.insert(1, 'site_key', fits['hole_key'].map(site_keys).astype('Int64'))
+    fits['hole_key'] = fits['hole_key'].astype('Int64')
+    return fits
+
+def write_porosity_fits(mad, registry, path, executor=None, n_workers=None):
+    if executor is None and n_workers is not None and n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            fits = fit_porosity(mad, registry, executor)
+    else:
+        fits = fit_porosity(mad, registry, executor)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    fits.to_csv(path, index=False)
+    return fits
+
+# eof
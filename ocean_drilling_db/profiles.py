@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 20:52:19 2026
+
+Depth-range queries on the depth-resolved datasets (iw_chem, mad, cns,
+age_depth).
+
+A ProfileStore keeps a dataset sorted by (site_key, hole, depth) with an
+offset table of the row range of every hole and of the holes of every site.
+A query finds the site by binary search on the site table and the depth range
+of each hole by binary search on its depths, and returns row slices of the
+sorted frame. A profile of a single hole is a slice of the stored frame, not
+a copy.
+
+"""
+import numpy as np
+import pandas as pd
+
+
+class ProfileStore:
+    def __init__(self, data, registry=None, depth_col=None):
+        # Datasets without site keys (iw_chem, mad, cns) get them from the registry
+        if 'site_key' not in data.columns:
+            data = registry.assign_hole_keys(data)
+        if depth_col is None:
+            depth_col = 'sample_depth' if 'sample_depth' in data.columns else 'depth'
+        self.depth_col = depth_col
+
+        data = data[data['site_key'].notna()]
+        data = data.sort_values(['site_key', 'hole', depth_col], kind='mergesort')
+        self.data = data.reset_index(drop=True)
+        self.depth = self.data[depth_col].to_numpy(dtype=float)
+        self.columns = {}
+
+        # Row range of every hole, in sorted order
+        sites = self.data['site_key'].to_numpy(dtype='int64')
+        holes = self.data['hole'].astype(str).to_numpy()
+        starts = np.flatnonzero(np.r_[True, (sites[1:] != sites[:-1]) |
+                                            (holes[1:] != holes[:-1])])
+        self.hole_starts = starts
+        self.hole_ends = np.r_[starts[1:], len(self.data)]
+        self.hole_sites = sites[starts]
+        self.hole_names = holes[starts]
+
+        # Range of holes of every site
+        self.sites, self.site_first = np.unique(self.hole_sites, return_index=True)
+        self.site_last = np.r_[self.site_first[1:], len(starts)]
+
+    def hole_ranges(self, site_key, top=-np.inf, bottom=np.inf, hole=None):
+        # (hole, start row, end row) of every hole of site_key with rows between top and bottom depth
+        n = np.searchsorted(self.sites, site_key)
+        if n == len(self.sites) or self.sites[n] != site_key:
+            return []
+        ranges = []
+        for h in range(self.site_first[n], self.site_last[n]):
+            if hole is not None and self.hole_names[h] != hole:
+                continue
+            start, end = self.hole_starts[h], self.hole_ends[h]
+            depths = self.depth[start:end]
+            first = start + np.searchsorted(depths, top, side='left')
+            last = start + np.searchsorted(depths, bottom, side='right')
+            if last > first:
+                ranges.append((self.hole_names[h], first, last))
+        return ranges
+
+    def profile(self, site_key, top=-np.inf, bottom=np.inf, hole=None):
+        # Rows of site_key (or one of its holes) between top and bottom depth
+        ranges = self.hole_ranges(site_key, top, bottom, hole)
+        if len(ranges) == 1:
+            return self.data.iloc[ranges[0][1]:ranges[0][2]]
+        elif len(ranges) == 0:
+            return self.data.iloc[0:0]
+        return pd.concat([self.data.iloc[start:end] for _, start, end in ranges])
+
+    def values(self, column, site_key, top=-np.inf, bottom=np.inf, hole=None):
+        # Array of one column over the same rows as profile()
+        if column not in self.columns:
+            self.columns[column] = self.data[column].to_numpy()
+        values = self.columns[column]
+        ranges = self.hole_ranges(site_key, top, bottom, hole)
+        if len(ranges) == 1:
+            return values[ranges[0][1]:ranges[0][2]]
+        return np.concatenate([values[start:end] for _, start, end in ranges] or [values[:0]])
+
+
+def build_profile_stores(registry, datasets):
+    # datasets: dict of dataset name to compiled depth-resolved DataFrame
+    return {name: ProfileStore(data, registry) for name, data in datasets.items()}
+
+# eof
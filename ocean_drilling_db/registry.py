@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 18:05:33 2026
+
+In-memory registry of the compiled hole metadata, shared by every compile_*
+function so no loader re-reads hole_metadata.csv or the Chikyu summary file.
+
+Holds hash indexes from site to site_key and from (site, hole) to hole_key,
+and the hole ID resolver for Chikyu data files. When site and hole are
+categoricals with the shared dictionaries of ocean_drilling_db.dictionaries,
+keys are also tabled by category code, and data with the same dictionaries
+gets its keys by code instead of by string.
+
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_categorical_dtype
+
+from ocean_drilling_db.hole_resolver import chikyu_resolver
+
+
+class MetadataRegistry:
+    def __init__(self, hole_metadata):
+        self.hole_metadata = hole_metadata
+        sites = hole_metadata['site'].astype(str)
+        holes = hole_metadata['hole'].astype(str)
+
+        # site -> site_key and (site, hole) -> hole_key
+        self.site_keys = pd.Series(hole_metadata['site_key'].values, index=sites)
+        self.site_keys = self.site_keys[~self.site_keys.index.duplicated()]
+        self.hole_keys = pd.Series(hole_metadata['hole_key'].values,
+                                   index=pd.MultiIndex.from_arrays([sites, holes]))
+        self.hole_keys = self.hole_keys[~self.hole_keys.index.duplicated()]
+
+        # site_key by site code and hole_key by (site code, hole code), where
+        # code + 1 so that missing values (code -1) have their own entry
+        self.site_categories = self.hole_categories = None
+        if is_categorical_dtype(hole_metadata['site']) and is_categorical_dtype(hole_metadata['hole']):
+            self.site_categories = hole_metadata['site'].cat.categories
+            self.hole_categories = hole_metadata['hole'].cat.categories
+            site_codes = hole_metadata['site'].cat.codes.to_numpy(dtype='int64') + 1
+            hole_codes = hole_metadata['hole'].cat.codes.to_numpy(dtype='int64') + 1
+            self.site_key_table = code_table(site_codes, hole_metadata['site_key'],
+                                             len(self.site_categories) + 1)
+            self.hole_key_table = code_table(site_codes * (len(self.hole_categories) + 1) + hole_codes,
+                                             hole_metadata['hole_key'],
+                                             (len(self.site_categories) + 1) * (len(self.hole_categories) + 1))
+
+        self.chikyu_resolver = chikyu_resolver(hole_metadata)
+
+        # Identifies the metadata for cached loader outputs (see manifest)
+        self.fingerprint = hashlib.sha1(
+            pd.util.hash_pandas_object(hole_metadata).values.tobytes()).hexdigest()
+
+    def shares_dictionaries(self, data, columns):
+        categories = {'site': self.site_categories, 'hole': self.hole_categories}
+        return all(categories[col] is not None and is_categorical_dtype(data[col]) and
+                   data[col].cat.categories.equals(categories[col]) for col in columns)
+
+    def site_key_values(self, data):
+        if self.shares_dictionaries(data, ['site']):
+            return self.site_key_table[data['site'].cat.codes.to_numpy(dtype='int64') + 1]
+        return data['site'].astype(str).map(self.site_keys).values
+
+    def hole_key_values(self, data):
+        if self.shares_dictionaries(data, ['site', 'hole']):
+            site_codes = data['site'].cat.codes.to_numpy(dtype='int64') + 1
+            hole_codes = data['hole'].cat.codes.to_numpy(dtype='int64') + 1
+            return self.hole_key_table[site_codes * (len(self.hole_categories) + 1) + hole_codes]
+        index = pd.MultiIndex.from_arrays([data['site'].astype(str), data['hole'].astype(str)])
+        return self.hole_keys.reindex(index).values
+
+    def assign_site_keys(self, data):
+        # Add site_key, keeping only rows from known sites, grouped by site_key
+        # in key order as an inner merge with hole_metadata would
+        site_keys = pd.Series(self.site_key_values(data), index=data.index)
+        data = data.assign(site_key=site_keys.astype('Int64'))[site_keys.notna()]
+        return data.sort_values('site_key', kind='mergesort')
+
+    def assign_hole_keys(self, data):
+        # Add hole_key and site_key to every row, missing where the hole is unknown
+        return data.assign(hole_key=pd.array(self.hole_key_values(data), dtype='Int64'),
+                           site_key=pd.array(self.site_key_values(data), dtype='Int64'))
+
+
+def code_table(codes, keys, size):
+    # Array of the key of the first row with each code, NaN for absent codes
+    table = np.full(size, np.nan)
+    codes, first = np.unique(codes, return_index=True)
+    table[codes] = keys.to_numpy(dtype=float, na_value=np.nan)[first]
+    return table
+
+# eof
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 22:47:15 2026
+
+Resampling of depth-resolved datasets (iw_chem, mad, cns) onto a regular
+depth grid, for all sites at once.
+
+Replicates (rep_key) and samples of different holes at the same site and depth
+are averaged. Each column is then linearly interpolated onto the grid between
+the shallowest and deepest sample of every site, with one searchsorted call
+over all sites (depths keyed by site, as in ocean_drilling_db.age_model).
+Grid depths outside a site's sampled range are not extrapolated.
+
+The result is a dense site x depth x column cube of float64, with a boolean
+mask of the cells that have a value, written as memory-mapped .npy files with
+a json file of the axes:
+    <name>.npy, <name>_mask.npy, <name>_axes.json
+
+"""
+import json
+import os
+
+import numpy as np
+from numpy.lib.format import open_memmap
+from pandas.api.types import is_float_dtype
+
+# Columns that locate a sample rather than measure it
+depth_columns = ['top', 'bottom', 'core_depth', 'sample_depth', 'depth']
+
+
+def value_columns(data):
+    return [col for col in data.columns
+            if is_float_dtype(data[col]) and col not in depth_columns]
+
+def collapse_replicates(data, columns, registry=None, depth_col='sample_depth'):
+    # Mean of every column per (site_key, depth)
+    if 'site_key' not in data.columns:
+        data = registry.assign_hole_keys(data)
+    data = data[['site_key', depth_col] + columns].dropna(subset=['site_key', depth_col])
+    data = data.astype({'site_key': 'int64', depth_col: float})
+    return data.groupby(['site_key', depth_col], sort=True)[columns].mean().reset_index()
+
+def interpolate_sites(site_index, depth, values, n_sites, grid):
+    # (n_sites, len(grid)) array of values interpolated within each site,
+    # for samples sorted by (site_index, depth)
+    out = np.full((n_sites, len(grid)), np.nan)
+    sites = np.arange(n_sites)
+    first = np.searchsorted(site_index, sites, side='left')
+    last = np.searchsorted(site_index, sites, side='right') - 1
+    fitted = last > first
+    if not fitted.any():
+        return out
+
+    top = np.where(fitted, depth[np.minimum(first, len(depth) - 1)], np.inf)
+    bottom = np.where(fitted, depth[np.maximum(last, 0)], -np.inf)
+    s, g = np.nonzero((grid >= top[:, None]) & (grid <= bottom[:, None]))
+
+    offset = 2 * max(np.abs(depth).max(), np.abs(grid).max()) + 1
+    end = np.searchsorted(site_index * offset + depth, s * offset + grid[g], side='right')
+    end = np.clip(end, first[s] + 1, last[s])
+    start = end - 1
+    fraction = (grid[g] - depth[start]) / (depth[end] - depth[start])
+    out[s, g] = values[start] + fraction * (values[end] - values[start])
+    return out
+
+def write_cube(data, grid, out_dir, name, columns=None, registry=None, depth_col='sample_depth'):
+    if columns is None:
+        columns = value_columns(data)
+    grid = np.asarray(grid, dtype=float)
+    samples = collapse_replicates(data, columns, registry, depth_col)
+    site_keys = np.unique(samples['site_key'].to_numpy())
+    site_index = np.searchsorted(site_keys, samples['site_key'].to_numpy())
+    depth = samples[depth_col].to_numpy()
+
+    os.makedirs(out_dir, exist_ok=True)
+    shape = (len(site_keys), len(grid), len(columns))
+    cube = open_memmap(os.path.join(out_dir, name + '.npy'), mode='w+', dtype='float64', shape=shape)
+    mask = open_memmap(os.path.join(out_dir, name + '_mask.npy'), mode='w+', dtype='bool', shape=shape)
+    for n, col in enumerate(columns):
+        values = samples[col].to_numpy(dtype=float)
+        present = np.isfinite(values)
+        layer = interpolate_sites(site_index[present], depth[present], values[present],
+                                  len(site_keys), grid)
+        cube[:, :, n] = layer
+        mask[:, :, n] = np.isfinite(layer)
+    cube.flush()
+    mask.flush()
+
+    with open(os.path.join(out_dir, name + '_axes.json'), 'w') as f:
+        json.dump({'site_key': site_keys.tolist(), 'depth': grid.tolist(),
+                   'columns': columns}, f)
+
+def open_cube(out_dir, name):
+    # Read-only memory maps of the cube and mask, and the axes
+    cube = np.load(os.path.join(out_dir, name + '.npy'), mmap_mode='r')
+    mask = np.load(os.path.join(out_dir, name + '_mask.npy'), mmap_mode='r')
+    with open(os.path.join(out_dir, name + '_axes.json')) as f:
+        axes = json.load(f)
+    return cube, mask, axes
+
+# eof
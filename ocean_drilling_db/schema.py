@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 13:40:27 2026
+
+Declared column types for each compiled dataset.
+
+Identifiers (leg, site, hole, core, section, method, ...) are stored as
+categoricals of strings, measurements as float64, integer keys as nullable
+Int64, and free text as object strings. Every loader and compile function
+returns its frame through enforce(), so the datasets carry typed columns
+instead of per-cell Python strings. Typed frames are stacked with concat(),
+which keeps categoricals as categoricals.
+
+Identifiers and text are written as they are stored, with one exception: a
+float column whose values are all whole numbers (e.g. core or section read
+with NaN in some rows, which forces pandas to float) is written as integers,
+so core 2 is '2' in every dataset, csv, and staging file rather than '2.0' in
+some of them. Labels then match across sources and datasets, which the joins
+on these columns and the shared dictionaries depend on.
+
+"""
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_categorical_dtype, is_float_dtype, union_categoricals
+
+# Values treated as missing when they appear as text
+missing_values = ['', 'nan', 'None', 'NaN']
+
+key = 'Int64'
+ident = 'category'
+number = 'float64'
+text = 'object'
+
+hole_metadata = {
+    'hole_key': key, 'site_key': key,
+    'leg': ident, 'site': ident, 'hole': ident,
+    'lat': number, 'lon': number, 'water_depth': number,
+    'total_penetration': number,
+}
+
+age_depth = {
+    'site_key': key,
+    'leg': ident, 'site': ident, 'hole': ident,
+    'depth': number, 'age': number,
+    'type': ident, 'source': ident,
+}
+
+mad = {
+    'hole_key': key, 'site_key': key,
+    'leg': ident, 'site': ident, 'hole': ident, 'core': ident, 'section': ident,
+    'sample_depth': number, 'porosity': number, 'grain_density': number,
+    'method': ident,
+}
+
+cns = {
+    'hole_key': key, 'site_key': key,
+    'leg': ident, 'site': ident, 'hole': ident, 'core': ident, 'section': ident,
+    'sample_depth': number, 'inorganic_carbon': number,
+    'calcium_carbonate': number, 'total_carbon': number,
+    'organic_carbon': number, 'organic_carbon_treated': number,
+    'nitrogen': number, 'sulfur': number, 'hydrogen': number,
+    'method': ident, 'data_source': ident, 'comments': text,
+}
+
+# Columns not listed here are analyte concentrations (see iw_chem_default)
+iw_chem = {
+    'sample_key': key, 'rep_key': key, 'hole_key': key, 'site_key': key,
+    'leg': ident, 'site': ident, 'hole': ident, 'core': ident, 'type': ident,
+    'section': ident, 'aw': ident,
+    'top': number, 'bottom': number, 'core_depth': number, 'sample_depth': number,
+    'ph_type': ident, 'alkalinity_type': ident, 'color': text,
+    'ref_1': ident, 'ref_2': ident, 'ref_3': ident, 'ref_4': ident,
+    'ref_5': ident, 'ref_6': ident,
+    'proceedings_label': text, 'Comments': text, 'More _comments': text,
+}
+iw_chem_default = number
+
+
+def as_text(ser):
+    if is_categorical_dtype(ser):
+        ser = ser.astype(object)
+    # Whole-number floats (e.g. cores read alongside NaN) are written as integers
+    elif is_float_dtype(ser) and (ser.dropna() % 1 == 0).all():
+        ser = ser.astype('Int64')
+    ser = ser.astype(object)
+    strings = ser.astype(str).str.strip()
+    return strings.mask(ser.isna() | strings.isin(missing_values))
+
+def to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+def as_number(ser):
+    if ser.dtype == object or is_categorical_dtype(ser):
+        # Exact float parsing of text, anything non-numeric becomes NaN
+        ser = as_text(ser)
+        try:
+            return ser.astype('float64')
+        except (TypeError, ValueError):
+            return ser.map(to_float).astype('float64')
+    return ser.astype('float64')
+
+def as_category(ser):
+    if is_categorical_dtype(ser):
+        # Clean the categories rather than every row, and recode
+        categories = as_text(pd.Series(ser.cat.categories))
+        codes, uniques = pd.factorize(categories, sort=True)
+        codes = np.append(codes, -1)[ser.cat.codes]
+        ser = pd.Series(pd.Categorical.from_codes(codes, uniques), index=ser.index, name=ser.name)
+        return ser.cat.remove_unused_categories()
+    return as_text(ser).astype('category')
+
+def convert(ser, dtype):
+    if dtype == ident:
+        return as_category(ser)
+    elif dtype == text:
+        return as_text(ser)
+    elif dtype == key:
+        return as_number(ser).round().astype('Int64')
+    return as_number(ser).astype(dtype)
+
+def enforce(frame, schema, default=None):
+    # Cast every column of frame to the type declared for it in schema
+    frame = frame.copy()
+    for col in frame.columns:
+        dtype = schema.get(col, default)
+        if dtype is not None:
+            frame[col] = convert(frame[col], dtype)
+    return frame
+
+def concat(frames, schema, default=None):
+    # Stack typed frames, columns missing from a frame are empty. Categoricals
+    # are combined with a union of their categories, not as object strings.
+    frames = [frame.reset_index(drop=True) for frame in frames]
+    columns = list(dict.fromkeys(col for frame in frames for col in frame.columns))
+    combined = {}
+    for col in columns:
+        dtype = schema.get(col, default)
+        parts = [frame[col] if col in frame.columns else pd.Series(np.nan, index=frame.index, name=col)
+                 for frame in frames]
+        if dtype == ident:
+            combined[col] = pd.Series(union_categoricals([convert(part, dtype) for part in parts],
+                                                         sort_categories=True))
+        elif dtype is not None:
+            combined[col] = pd.concat([convert(part, dtype) for part in parts], ignore_index=True)
+        else:
+            combined[col] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(combined, columns=columns)
+
+# eof
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 20:14:52 2026
+
+Spatial index over the holes in hole_metadata.
+
+Hole coordinates are stored as unit vectors on the sphere in a k-d tree, where
+the straight-line (chord) distance between two points orders them exactly as
+the great-circle distance does. Queries return hole_key and site_key arrays:
+    nearest: k nearest holes to each of many points, with distances in km
+    within: holes within a radius (km) of a point
+    in_polygon: holes inside a lat/lon polygon (edges straight in lat/lon)
+
+Holes occupied on several legs are indexed once, at their first position.
+
+Requires scipy.
+
+"""
+import numpy as np
+from scipy.spatial import cKDTree
+
+# Mean Earth radius (km)
+earth_radius = 6371.0088
+
+
+def unit_vectors(lat, lon):
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    return np.stack([np.cos(lat) * np.cos(lon),
+                     np.cos(lat) * np.sin(lon),
+                     np.sin(lat)], axis=-1)
+
+def chord_to_km(chord):
+    return 2 * earth_radius * np.arcsin(np.minimum(chord / 2, 1))
+
+def km_to_chord(km):
+    return 2 * np.sin(np.minimum(km / earth_radius, np.pi) / 2)
+
+def points_in_polygon(lat, lon, poly_lat, poly_lon):
+    # Even-odd ray casting along lines of latitude, vectorized over points
+    inside = np.zeros(len(lat), dtype=bool)
+    lat_j, lon_j = poly_lat[-1], poly_lon[-1]
+    for lat_i, lon_i in zip(poly_lat, poly_lon):
+        crosses = (lat_i > lat) != (lat_j > lat)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            lon_cross = lon_i + (lat - lat_i) * (lon_j - lon_i) / (lat_j - lat_i)
+        inside ^= crosses & (lon < lon_cross)
+        lat_j, lon_j = lat_i, lon_i
+    return inside
+
+
+class HoleIndex:
+    def __init__(self, hole_metadata):
+        holes = hole_metadata.dropna(subset=['lat', 'lon', 'hole_key', 'site_key'])
+        holes = holes.drop_duplicates('hole_key').reset_index(drop=True)
+        self.holes = holes
+        self.hole_keys = holes['hole_key'].to_numpy(dtype='int64')
+        self.site_keys = holes['site_key'].to_numpy(dtype='int64')
+        self.lat = holes['lat'].to_numpy(dtype=float)
+        self.lon = holes['lon'].to_numpy(dtype=float)
+        self.tree = cKDTree(unit_vectors(self.lat, self.lon))
+
+    def nearest(self, lat, lon, k=1):
+        # Arrays of shape (points, k): hole_key, site_key, distance (km)
+        points = unit_vectors(np.atleast_1d(lat), np.atleast_1d(lon))
+        k = min(k, len(self.hole_keys))
+        chord, idx = self.tree.query(points, k=k)
+        chord, idx = chord.reshape(len(points), k), idx.reshape(len(points), k)
+        return self.hole_keys[idx], self.site_keys[idx], chord_to_km(chord)
+
+    def within(self, lat, lon, radius_km):
+        # hole_key, site_key, distance (km) of holes within radius_km, nearest first
+        point = unit_vectors(lat, lon)
+        idx = np.array(self.tree.query_ball_point(point, km_to_chord(radius_km)), dtype=int)
+        distance = chord_to_km(np.linalg.norm(self.tree.data[idx] - point, axis=1))
+        order = np.argsort(distance, kind='stable')
+        idx = idx[order]
+        return self.hole_keys[idx], self.site_keys[idx], distance[order]
+
+    def in_polygon(self, poly_lat, poly_lon):
+        # hole_key, site_key of holes inside the polygon given by its vertices
+        poly_lat = np.asarray(poly_lat, dtype=float)
+        poly_lon = np.asarray(poly_lon, dtype=float)
+        # Only holes inside the polygon's bounding box are tested
+        box = np.flatnonzero((self.lat >= poly_lat.min()) & (self.lat <= poly_lat.max()) &
+                             (self.lon >= poly_lon.min()) & (self.lon <= poly_lon.max()))
+        idx = box[points_in_polygon(self.lat[box], self.lon[box], poly_lat, poly_lon)]
+        return self.hole_keys[idx], self.site_keys[idx]
+
+# eof
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 12:26:41 2026
+
+Chunked reading of the large delimited source files within a memory budget.
+
+Without a budget, read_csv yields the whole file as a single frame. With a
+budget (MB), it yields the file in chunks of a bounded number of rows: the
+budget divided by the parsed size of a row (measured on the first rows) times
+working_copies, the number of chunk-sized copies the rename/replace/strip and
+melt chains of a loader hold at once. Each loader turns a chunk into typed
+output (schema.enforce) before the next one is read, and collect() appends the
+typed chunks, so the memory of a loader stays near the budget plus its typed
+output.
+
+Pore water loaders key samples over several rows. They give the columns that
+identify a sample, and a first pass over only those columns finds the rows
+after which no sample continues. Chunks end only there, so every sample is
+read in a single chunk and sample keys numbered per chunk, offset by collect(),
+are the same as for the whole file.
+
+"""
+import numpy as np
+import pandas as pd
+
+from ocean_drilling_db import schema
+
+# Working memory of a chunk as a multiple of its parsed size
+working_copies = 10
+
+# Rows read to measure the parsed size of a row
+sample_rows = 1000
+
+min_chunk_rows = 1000
+
+
+def chunk_rows(path, memory_budget, read_kwargs):
+    sample = pd.read_csv(path, nrows=sample_rows, **read_kwargs)
+    row_bytes = sample.memory_usage(index=False, deep=True).sum() / max(len(sample), 1)
+    return max(min_chunk_rows, int(memory_budget * 2**20 / (row_bytes * working_copies)))
+
+def group_chunk_sizes(path, group_cols, rows, prepare, read_kwargs):
+    # Sizes of chunks of at least rows rows (except the last) that end only
+    # after the last row of every group of equal group_cols values begun so far.
+    # Values are compared as written, types inferred per chunk could differ.
+    hashes = []
+    read_kwargs = dict(read_kwargs, dtype=str)
+    for ids in pd.read_csv(path, usecols=group_cols, chunksize=rows, **read_kwargs):
+        if prepare is not None:
+            ids = prepare(ids)
+        hashes.append(pd.util.hash_pandas_object(ids, index=False).to_numpy())
+    hashes = np.concatenate(hashes) if hashes else np.empty(0, dtype='uint64')
+    n_rows = len(hashes)
+
+    # Last row of the group of every row
+    groups, last_reversed = np.unique(hashes[::-1], return_index=True)
+    last = (n_rows - 1 - last_reversed)[np.searchsorted(groups, hashes)]
+    ends = np.flatnonzero(np.maximum.accumulate(last) == np.arange(n_rows)) + 1
+
+    sizes = []
+    start = 0
+    while start < n_rows:
+        end = ends[np.searchsorted(ends, start + rows)] if start + rows < n_rows else n_rows
+        sizes.append(end - start)
+        start = end
+    return sizes
+
+def read_csv(path, memory_budget=None, group_cols=None, prepare=None, **read_kwargs):
+    # Generator of the frames of a file, read with pd.read_csv(path, **read_kwargs).
+    # group_cols: columns (names or positions) whose rows must share a chunk,
+    # compared after prepare(frame of group_cols) if given
+    if memory_budget is None:
+        yield pd.read_csv(path, **read_kwargs)
+        return
+    rows = chunk_rows(path, memory_budget, read_kwargs)
+    if group_cols is None:
+        with pd.read_csv(path, chunksize=rows, **read_kwargs) as reader:
+            yield from reader
+        return
+    sizes = group_chunk_sizes(path, group_cols, rows, prepare, read_kwargs)
+    with pd.read_csv(path, iterator=True, **read_kwargs) as reader:
+        for size in sizes:
+            yield reader.get_chunk(size)
+
+def collect(frames, table_schema, default=None, key=None):
+    # Typed frames of a loader appended as they are produced, then stacked.
+    # With key, the keys of each frame are offset past those of earlier frames.
+    parts = []
+    offset = 0
+    for frame in frames:
+        if key is not None and len(frame):
+            frame = frame.assign(**{key: frame[key] + offset})
+            offset = int(frame[key].max()) + 1
+        parts.append(frame)
+    if len(parts) == 1:
+        return parts[0]
+    return schema.concat(parts, table_schema, default)
+
+# eof
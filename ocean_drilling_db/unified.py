@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 14:02:33 2026
+
+Unified sample table of pore water chemistry with the porosity, grain density,
+and carbon, nitrogen, and sulfur contents measured nearest to every sample.
+
+Every row of iw_chem with a known hole and depth gets the MAD and CNS
+measurements of the same hole (hole_key) at the sample depth nearest to its
+own within tolerance (m), with one as-of merge per dataset over all holes
+(pd.merge_asof by hole_key). Replicate MAD or CNS measurements at one depth
+are averaged first. The depth of each match is kept as mad_depth and
+cns_depth, and measurements without a match within tolerance are missing.
+
+The table is written like the compiled datasets (see ocean_drilling_db.export),
+as unified_samples.parquet and unified_samples.arrow.
+
+"""
+import pandas as pd
+
+from ocean_drilling_db import export
+from ocean_drilling_db import schema
+
+# Maximum depth difference (m) between a pore water sample and its matches
+depth_tolerance = 0.5
+
+# Measurements joined from each dataset
+joined_columns = {
+    'mad': [col for col, dtype in schema.mad.items() if dtype == schema.number and col != 'sample_depth'],
+    'cns': [col for col, dtype in schema.cns.items() if dtype == schema.number and col != 'sample_depth'],
+}
+
+
+def located_samples(data, registry):
+    # Rows with a known hole and depth, with integer hole_key
+    if 'hole_key' not in data.columns:
+        data = registry.assign_hole_keys(data)
+    data = data[data['hole_key'].notna() & data['sample_depth'].notna()]
+    return data.astype({'hole_key': 'int64', 'sample_depth': float})
+
+def depth_means(data, columns, registry):
+    # Mean of every column per (hole_key, sample_depth), sorted by depth
+    columns = [col for col in columns if col in data.columns]
+    data = located_samples(data, registry)[['hole_key', 'sample_depth'] + columns]
+    data = data.groupby(['hole_key', 'sample_depth'], sort=False)[columns].mean().reset_index()
+    return data.sort_values('sample_depth', kind='mergesort')
+
+def nearest_samples(samples, data, name, registry, tolerance=depth_tolerance):
+    # samples (sorted by sample_depth) with the columns of the data row of the
+    # same hole nearest in depth within tolerance, and its depth as <name>_depth
+    matches = depth_means(data, joined_columns[name], registry)
+    matches[name + '_depth'] = matches['sample_depth']
+    return pd.merge_asof(samples, matches, on='sample_depth', by='hole_key',
+                         direction='nearest', tolerance=tolerance,
+                         suffixes=('', '_' + name))
+
+def unified_samples(iw_chem, mad, cns, registry, tolerance=depth_tolerance):
+    samples = located_samples(iw_chem, registry).sort_values('sample_depth', kind='mergesort')
+    samples = nearest_samples(samples, mad, 'mad', registry, tolerance)
+    samples = nearest_samples(samples, cns, 'cns', registry, tolerance)
+    samples = samples.sort_values(['hole_key', 'sample_depth', 'sample_key', 'rep_key'], kind='mergesort')
+    return samples.astype({'hole_key': schema.key}).reset_index(drop=True)
+
+def write_unified_samples(iw_chem, mad, cns, registry, out_dir, tolerance=depth_tolerance):
+    unified = unified_samples(iw_chem, mad, cns, registry, tolerance)
+    export.write_dataset(unified, 'unified_samples', out_dir)
+    return unified
+
+# eof
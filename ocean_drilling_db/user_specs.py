@@ -9,6 +9,10 @@ User-specific variables for database integration
 
 """
 
+# Database backend, either 'mysql' (a server at host, with the credentials
+# below) or 'sqlite' (a single file, see data_filepaths.sqlite_db)
+backend = 'mysql'
+
 username = 'root'
 password = 'backcountry'
 host = '127.0.0.1'